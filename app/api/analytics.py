@@ -0,0 +1,49 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas.analytics import CategorySalesOut, DailySalesOut, FoodSalesOut
+from app.services import analytics_service
+from app.services.auth_service import CurrentUser, get_admin_user
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+# All of these read the daily rollup tables, never orders/order_items.
+# Ranges are inclusive UTC days and default to the last 30 days.
+
+@router.get("/sales/daily", response_model=List[DailySalesOut])
+def get_daily_sales(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    admin_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Revenue and units sold per day - ADMIN ONLY"""
+    date_from, date_to = analytics_service.resolve_range(date_from, date_to)
+    return analytics_service.daily_sales(db, date_from, date_to)
+
+@router.get("/sales/foods", response_model=List[FoodSalesOut])
+def get_food_sales(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=200),
+    admin_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Best-selling dishes by revenue - ADMIN ONLY"""
+    date_from, date_to = analytics_service.resolve_range(date_from, date_to)
+    return analytics_service.food_sales(db, date_from, date_to, limit=limit)
+
+@router.get("/sales/categories", response_model=List[CategorySalesOut])
+def get_category_sales(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    admin_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Sales per category by revenue - ADMIN ONLY"""
+    date_from, date_to = analytics_service.resolve_range(date_from, date_to)
+    return analytics_service.category_sales(db, date_from, date_to)
@@ -1,30 +1,57 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.schemas.user import UserCreate, UserOut, UserVerify, OTPResend, UserLogin
 from datetime import timedelta
-from app.database import get_db, SessionLocal
-from app.services.auth_service import get_user_by_email, register_user, verify_email, resend_verification_otp, verify_password
+from app.config import settings
+from app.database import get_async_db, get_db, SessionLocal
+from app.services.cart_store import cart_store
+from app.services.auth_service import (
+    get_password_hash_async, get_user_by_email, get_user_by_email_async, register_user, verify_email,
+    resend_verification_otp, verify_password_async, rehash_password_if_needed_async
+)
+from app.utils.rate_limit import RateLimit
 
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
-@router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+# Per-route limits. Each runs before the database session or bcrypt is touched
+register_limit = RateLimit("register", per_ip=settings.REGISTER_RATE_LIMIT_PER_IP)
+login_limit = RateLimit(
+    "login",
+    per_ip=settings.LOGIN_RATE_LIMIT_PER_IP,
+    per_email=settings.LOGIN_RATE_LIMIT_PER_EMAIL
+)
+otp_limit = RateLimit("otp", per_ip=settings.OTP_RATE_LIMIT_PER_IP, per_email=settings.OTP_RATE_LIMIT_PER_EMAIL)
+
+@router.post(
+    "/register",
+    response_model=UserOut,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(register_limit)]
+)
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+    # async so that waiting on bcrypt doesn't hold a threadpool thread; the sync
+    # database work is handed to the threadpool explicitly
 
     # check if email already exist
-    existing_user = get_user_by_email(db, email=user_data.email)
+    existing_user = await run_in_threadpool(get_user_by_email, db, email=user_data.email)
     if existing_user :
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Credentials already exists"
         )
 
+    hashed_password = await get_password_hash_async(user_data.password)
+
     # Call service logic
-    new_user, otp = register_user(
+    new_user, otp = await run_in_threadpool(
+        register_user,
         db=db,
         email=user_data.email,
         phone=user_data.phone,
-        password=user_data.password
+        hashed_password=hashed_password
     )
 
     # Simulate sending OTP to console
@@ -34,7 +61,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
     return new_user
 
-@router.post("/verify")
+@router.post("/verify", dependencies=[Depends(otp_limit)])
 def verify_account(verify_data: UserVerify, db: Session = Depends(get_db)):
     success = verify_email(db, verify_data.email, verify_data.otp_code)
 
@@ -46,11 +73,13 @@ def verify_account(verify_data: UserVerify, db: Session = Depends(get_db)):
     
     return {"message": "Account verified successfully"}
 
-@router.post("/login")
-def login(credentials: UserLogin, request: Request, db: Session = Depends(get_db)):
+@router.post("/login", dependencies=[Depends(login_limit)])
+async def login(credentials: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # async end to end: the lookup uses the async session and bcrypt is awaited on its
+    # own pool, so a login flood ties up neither request threads nor the event loop
 
     # Find user by email
-    user = get_user_by_email(db, credentials.email)
+    user = await get_user_by_email_async(db, credentials.email)
 
     if not user:
         raise HTTPException(
@@ -59,7 +88,7 @@ def login(credentials: UserLogin, request: Request, db: Session = Depends(get_db
         )
     
     # Verify password
-    if not verify_password(credentials.password, user.hashed_password):
+    if not await verify_password_async(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -68,6 +97,9 @@ def login(credentials: UserLogin, request: Request, db: Session = Depends(get_db
     # Check if verified
     if not user.is_verified:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Email not verified please verify your email")
+
+    # Transparently upgrade the stored hash if BCRYPT_ROUNDS changed since it was made
+    await rehash_password_if_needed_async(db, user, credentials.password)
     
     # Store user_id in Session (secure cookie)
     request.session["user_id"] = user.id
@@ -78,7 +110,7 @@ def login(credentials: UserLogin, request: Request, db: Session = Depends(get_db
         "user": UserOut.from_orm(user)
     }
 
-@router.post("/resend-otp")
+@router.post("/resend-otp", dependencies=[Depends(otp_limit)])
 def resend_otp(request: OTPResend, db: Session = Depends(get_db)):
     result = resend_verification_otp(db, request.email)
 
@@ -101,6 +133,11 @@ def resend_otp(request: OTPResend, db: Session = Depends(get_db)):
 def logout(request: Request):
     """Clear session (logout)"""
 
+    # The cart lives server-side now, so drop it along with the session
+    cart_id = request.session.get("cart_id")
+    if cart_id:
+        cart_store.delete(cart_id)
+
     request.session.clear()
 
     return{"message": "Logout out successfully"}
\ No newline at end of file
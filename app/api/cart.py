@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from app.database import get_db
+from app.services.cart_store import cart_store, new_cart_id
 from app.services.order_service import create_order
 
 router = APIRouter(prefix="/cart", tags=["Shopping Cart"])
@@ -12,16 +13,28 @@ class CartItemAdd(BaseModel):
     food_id: int
     quantity: int = 1
 
+def _cart_id(request: Request, create: bool = False) -> str | None:
+    """The session cookie only holds a small cart id; the cart itself lives in the cart store."""
+    cart_id = request.session.get("cart_id")
+    if not cart_id and create:
+        cart_id = new_cart_id()
+        request.session["cart_id"] = cart_id
+    return cart_id
+
+def _load_cart(request: Request) -> dict:
+    cart_id = _cart_id(request)
+    return cart_store.get(cart_id) if cart_id else {}
+
 @router.get("/")
 def view_cart(request: Request):
     """View the current content of the session cart."""
-    # This retrieves the cart from the session, or default returns to an empty dictionary
-    cart = request.session.get("cart", {})
+    # This retrieves the cart from the cart store, or default returns to an empty dictionary
+    cart = _load_cart(request)
     return {"cart": cart}
 
 @router.post("/add")
 def add_to_cart(item: CartItemAdd, request: Request):
-    cart = request.session.get("cart", {})
+    cart = _load_cart(request)
 
     # Session dictionary keys is saved always as string
     food_id_str = str(item.food_id)
@@ -32,19 +45,19 @@ def add_to_cart(item: CartItemAdd, request: Request):
     else:
         cart[food_id_str] = item.quantity
 
-    # Save back to Session
-    request.session["cart"] = cart
+    # Save back to the cart store
+    cart_store.save(_cart_id(request, create=True), cart)
     return {"message": "Item added to cart", "cart": cart}
 
 @router.delete("/remove/{food_id}")
 def remove_from_cart(food_id: int, request: Request):
     """ To remove a specific item from the cart entirely."""
-    cart = request.session.get("cart", {})
+    cart = _load_cart(request)
     food_id_str = str(food_id)
 
     if food_id_str in cart:
         del cart[food_id_str]
-        request.session["cart"] = cart
+        cart_store.save(_cart_id(request), cart)
         return {"message": "Item removed", "cart": cart}
     
     raise HTTPException(
@@ -65,7 +78,7 @@ def checkout(request: Request,  db: Session = Depends(get_db)):
             detail="You must be logged in to checkout"
         )
     
-    cart = request.session.get("cart", {})
+    cart = _load_cart(request)
     if not cart:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -79,7 +92,7 @@ def checkout(request: Request,  db: Session = Depends(get_db)):
     new_order = create_order(db, user_id=user_id, cart_items=formatted_items)
 
     # If successful, empty the cart
-    request.session.pop("cart", None)
+    cart_store.delete(_cart_id(request))
 
     return {
         "message": "Order placed successfully!!",
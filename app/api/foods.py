@@ -1,42 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import time
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.database import get_db
-from app.services import food_service
-from app.schemas.food import CategoryOut, FoodCreate, FoodUpdate, FoodOut
-from app.services.auth_service import get_admin_user
-from app.models.user import User
+from app.config import settings
+from app.database import get_async_db, get_db
+from app.services import food_import_service, food_service
+from app.schemas.food import CategoryOut, FoodCreate, FoodImportReport, FoodUpdate, FoodOut, FoodSuggestion
+from app.services.auth_service import CurrentUser, get_admin_user
+from app.utils.fast_json import FastJSONResponse
+from app.utils.http_cache import http_date, is_not_modified
 
 router = APIRouter(prefix="/foods", tags=["Menu & Foods"])
 
-@router.get("/", response_model=List[FoodOut])
-def get_menu(
+def _apply_menu_validators(request: Request, response: Response, validators: tuple[str, float]):
+    """Adds ETag/Last-Modified/Cache-Control to a menu read, or raises 304 if the client's copy is current."""
+    etag, last_modified = validators
+    headers = {"ETag": etag, "Cache-Control": settings.MENU_CACHE_CONTROL}
+    # Last-Modified only has whole seconds. While the second of the last change is still
+    # running, another write could land in it, and a copy stamped with that second would then
+    # pass If-Modified-Since for good. So it's only sent once that second is over (the ETag,
+    # which changes on every write, is always sent).
+    if int(last_modified) < int(time.time()):
+        headers["Last-Modified"] = http_date(last_modified)
+    if is_not_modified(request, etag, last_modified):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+async def menu_conditional_get(request: Request, response: Response):
+    """Conditional GET for menu lists.
+
+    Used as a decorator dependency so it runs before the session is opened: a 304 costs no
+    query and no serialization.
+    """
+    _apply_menu_validators(request, response, food_service.menu_validators())
+
+@router.get("/", response_model=List[FoodOut], dependencies=[Depends(menu_conditional_get)])
+async def get_menu(
+    response: Response,
     category_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Fetch the available menu items with optional category filtering.
     """
-    return food_service.list_foods(db, category_id=category_id, is_available=True)
+    if settings.FAST_JSON:
+        # Returning a Response skips FastAPI's own validation and encoding, and its headers;
+        # carry over the ETag/Cache-Control set by menu_conditional_get
+        encoded = await food_service.list_foods_json_async(db, category_id=category_id)
+        return FastJSONResponse(encoded, headers=dict(response.headers))
+    return await food_service.list_foods_async(db, category_id=category_id, is_available=True)
 
 
-@router.get("/categories", response_model=List[CategoryOut])
-def get_categories(db: Session = Depends(get_db)):
+@router.get("/categories", response_model=List[CategoryOut], dependencies=[Depends(menu_conditional_get)])
+async def get_categories(db: AsyncSession = Depends(get_async_db)):
     """"List all food categories ("Sides", "Main Dish", "Drinks", "Desserts")."""
-    from app.models.food import Category
-    return db.query(Category).all()
+    return await food_service.list_categories_async(db)
+
+
+@router.get("/search", response_model=List[FoodOut], dependencies=[Depends(menu_conditional_get)])
+async def search_menu(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over available menu item names and descriptions, best match first."""
+    return await food_service.search_foods_async(db, q, limit)
+
+
+@router.get("/autocomplete", response_model=List[FoodSuggestion], dependencies=[Depends(menu_conditional_get)])
+async def autocomplete_menu(
+    prefix: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=20),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Menu item names with a word starting with `prefix`, for search-as-you-type."""
+    return await food_service.autocomplete_async(db, prefix, limit)
+
+
+@router.get("/cache-stats")
+def get_menu_cache_stats(admin_user: CurrentUser = Depends(get_admin_user)):
+    """Hit/miss counters for the in-process menu cache - ADMIN ONLY"""
+    return food_service.menu_cache.stats()
 
 
 @router.get("/{food_id}", response_model=FoodOut)
-def get_food(food_id: int, db: Session = Depends(get_db)):
+def get_food(food_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """"Fetch details of a specific food item by its ID."""
-    return food_service.get_food_by_id(db, food_id)
+    # Validators are read before the item, so a concurrent write can leave the ETag older
+    # than the data (one extra 200 later) but never newer (a stale 304)
+    validators = food_service.menu_validators()
+    # A missing item is a 404 whatever If-None-Match says (even "*")
+    food = food_service.get_menu_item(db, food_id)
+    _apply_menu_validators(request, response, validators)
+    return food
 
 
 # Admin endpoints (for managing menu items) - these will be protected with authentication in a real app
 @router.post("/", response_model=FoodOut, status_code=status.HTTP_201_CREATED)
-def add_food(food_data: FoodCreate, admin_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+def add_food(food_data: FoodCreate, admin_user: CurrentUser = Depends(get_admin_user), db: Session = Depends(get_db)):
     """Add a new food item to the menu."""
     return food_service.create_food(
         db,
@@ -46,7 +110,23 @@ def add_food(food_data: FoodCreate, admin_user: User = Depends(get_admin_user),
         category_id=food_data.category_id,
     )
 
+@router.post("/import", response_model=FoodImportReport)
+def import_foods(
+    file: UploadFile = File(...),
+    import_format: Optional[str] = Query(None, alias="format", pattern="^(csv|jsonl)$"),
+    batch_size: int = Query(500, ge=1, le=5000),
+    admin_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Create or update many menu items from a CSV or JSON Lines file - ADMIN ONLY
+
+    Columns/keys: name, description, price, is_available, and category (name) or category_id.
+    Items are matched to existing ones by name. Bad rows are skipped and reported.
+    """
+    import_format = food_import_service.import_format_for(file.filename, import_format)
+    return food_import_service.import_foods(db, file.file, import_format, batch_size=batch_size)
+
 @router.patch("/{food_id}", response_model=FoodOut)
-def update_food(food_id: int, food_data: FoodUpdate, admin_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+def update_food(food_id: int, food_data: FoodUpdate, admin_user: CurrentUser = Depends(get_admin_user), db: Session = Depends(get_db)):
     update_dict = food_data.model_dump(exclude_unset=True)
     return food_service.update_food_details(db, food_id, update_dict)
\ No newline at end of file
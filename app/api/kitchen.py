@@ -0,0 +1,37 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, Response, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas.kitchen import KitchenBatch
+from app.schemas.order import OrderOut
+from app.services import kitchen_service, order_service
+from app.services.auth_service import CurrentUser, get_admin_user
+
+router = APIRouter(prefix="/kitchen", tags=["Kitchen"])
+
+# Batches group every waiting portion of one dish across confirmed orders,
+# the batch holding the oldest waiting order first.
+
+@router.get("/queue", response_model=List[KitchenBatch])
+def get_kitchen_queue(
+    limit: int = Query(20, ge=1, le=100),
+    admin_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """The next batches to cook, without claiming them - ADMIN ONLY"""
+    return kitchen_service.describe_batches(db, kitchen_service.kitchen_queue.peek(limit))
+
+@router.post("/claim", response_model=KitchenBatch, responses={204: {"description": "Nothing waiting"}})
+def claim_next_batch(admin_user: CurrentUser = Depends(get_admin_user), db: Session = Depends(get_db)):
+    """Take the next batch; its confirmed orders move to preparing - ADMIN ONLY"""
+    batch = order_service.claim_kitchen_batch(db)
+    if batch is None:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return batch
+
+@router.post("/orders/{order_id}/advance", response_model=OrderOut)
+def advance_order(order_id: int, admin_user: CurrentUser = Depends(get_admin_user), db: Session = Depends(get_db)):
+    """Move an order to its next status (e.g. preparing -> out_for_delivery) - ADMIN ONLY"""
+    return order_service.advance_order(db, order_id)
@@ -1,35 +1,191 @@
+import json
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
 
-from app.database import get_db
-from app.models.order import Order
-from app.models.user import User
-from app.services import order_service
-from app.services.auth_service import get_admin_user, get_current_user
-from app.schemas.order import OrderOut
-from typing import List
+from app.config import settings
+from app.database import get_async_db, get_db
+from app.services import auth_service, order_service
+from app.services.auth_service import (
+    CurrentUser, get_admin_user, get_current_user, get_current_user_async, get_stream_admin, get_stream_user
+)
+from app.services.order_events import ADMIN_TOPIC, order_events, user_topic
+from app.schemas.order import OrderOut, OrderPage, OrderStatusBulkResult, OrderStatusBulkUpdate
+from app.utils.fast_json import FastJSONResponse, ResponseEncoder
+from app.utils.pubsub import EVICTED, Subscription
+from typing import Optional
+from datetime import datetime, timezone
 
 router = APIRouter(prefix="/orders", tags=["Order"])
 
-@router.get("/my-orders", response_model=List[OrderOut])
-def list_my_orders(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Fetch all orders placed by the currently authenticated user."""
-    return order_service.get_user_orders(db, user_id=current_user.id)
+order_page_encoder = ResponseEncoder(OrderPage)
+
+@router.get("/", response_model=OrderPage)
+def list_all_orders(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    user_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    include_archived: bool = False,
+    admin_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Browse all orders with optional status, user and created-at range filters - ADMIN ONLY"""
+    orders, next_cursor = order_service.list_orders(
+        db,
+        status_filter=status_filter,
+        user_id=user_id,
+        created_from=created_from,
+        created_to=created_to,
+        limit=limit,
+        cursor=cursor,
+        include_archived=include_archived
+    )
+    return {"orders": orders, "next_cursor": next_cursor}
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+@router.get("/export")
+def export_orders(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_archived: bool = False,
+    admin_user: CurrentUser = Depends(get_admin_user)
+):
+    """Download every matching order with its items as NDJSON or CSV, streamed - ADMIN ONLY"""
+    chunks = order_service.export_orders(
+        status_filter=status_filter,
+        created_from=created_from,
+        created_to=created_to,
+        export_format=export_format,
+        include_archived=include_archived
+    )
+    filename = f"orders-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/my-orders", response_model=OrderPage)
+async def list_my_orders(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Fetch the orders placed by the currently authenticated user, newest first.
+
+    Pass the returned next_cursor back as `cursor` to get the next page.
+    """
+    orders, next_cursor = await order_service.get_user_orders_async(db, user_id=current_user.id, limit=limit, cursor=cursor)
+    if settings.FAST_JSON:
+        return FastJSONResponse(order_page_encoder.encode({"orders": orders, "next_cursor": next_cursor}))
+    return {"orders": orders, "next_cursor": next_cursor}
+
+# Sent first on every event stream: how long a browser's EventSource waits before reconnecting
+SSE_RETRY_MS = 3000
+
+async def _sse_events(subscription: Subscription):
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while True:
+            event = await subscription.get(timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            if event is None:
+                # Comment line: keeps proxies from timing out an idle stream
+                yield ": heartbeat\n\n"
+            elif event is EVICTED:
+                yield 'event: evicted\ndata: {"detail": "Too far behind, reconnect and reload orders"}\n\n'
+                return
+            else:
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        order_events.unsubscribe(subscription)
+
+def _sse_response(subscription: Subscription) -> StreamingResponse:
+    return StreamingResponse(
+        _sse_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/events")
+async def stream_my_order_events(current_user: CurrentUser = Depends(get_stream_user)):
+    """Server-Sent Events stream of status changes to the current user's orders"""
+    return _sse_response(order_events.subscribe(user_topic(current_user.id)))
+
+@router.get("/events/all")
+async def stream_all_order_events(admin_user: CurrentUser = Depends(get_stream_admin)):
+    """Server-Sent Events stream of every new order and status change - ADMIN ONLY"""
+    return _sse_response(order_events.subscribe(ADMIN_TOPIC))
+
+@router.websocket("/events/ws")
+async def order_events_socket(websocket: WebSocket, scope: str = "mine"):
+    """The same events over a WebSocket. `?scope=all` streams every order (admins only)."""
+    user_id = websocket.session.get("user_id")
+    identity = await auth_service.load_identity_async(user_id) if user_id else None
+    if identity is None or (scope == "all" and not identity.is_admin):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = order_events.subscribe(ADMIN_TOPIC if scope == "all" else user_topic(identity.id))
+    try:
+        while True:
+            event = await subscription.get(timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            if event is None:
+                # Also how a client that went away without closing is noticed
+                await websocket.send_json({"type": "heartbeat"})
+            elif event is EVICTED:
+                await websocket.send_json({"type": "evicted", "detail": "Too far behind, reconnect and reload orders"})
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                return
+            else:
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        order_events.unsubscribe(subscription)
 
 @router.get("/{order_id}", response_model=OrderOut)
-def get_order_details(order_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_order_details(
+    order_id: int,
+    current_user: CurrentUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
 
     """Fetch Specific order by ID - user can only see their orders"""
 
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await order_service.get_order_async(db, order_id)
 
-    if not order:
+    # Admins can look up any order; customers only their own
+    if order.user_id != current_user.id and not current_user.is_admin:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
     
     return order
 
+@router.patch("/status", response_model=OrderStatusBulkResult)
+def bulk_update_order_status(
+    payload: OrderStatusBulkUpdate,
+    admin_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Move many orders to one status in a single transaction, with a result per order - ADMIN ONLY
+
+    Orders that can't make the transition are reported and left as they are; the rest are updated.
+    """
+    results = order_service.bulk_update_order_status(db, payload.order_ids, payload.status)
+    updated = sum(result["updated"] for result in results)
+    return {"updated": updated, "failed": len(results) - updated, "results": results}
+
 @router.patch("/{order_id}/status")
-def update_order_status(order_id: int, new_status: str, admin_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+def update_order_status(order_id: int, new_status: str, admin_user: CurrentUser = Depends(get_admin_user), db: Session = Depends(get_db)):
 
     """Update order status - ADMIN ONLY"""
 
@@ -44,7 +200,7 @@ def update_order_status(order_id: int, new_status: str, admin_user: User = Depen
 @router.delete("/{order_id}/cancel")
 def cancel_order(
     order_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     
@@ -1,13 +1,93 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-import os
-from dotenv import load_dotenv
-
-load_dotenv
 
+# Values come from environment variables or the .env file (pydantic-settings reads both)
 class Settings(BaseSettings):
-    SECRET_KEY: str = os.getenv("SECRET_KEY")
-    DATABASE_URL: str = os.getenv("DATABASE_URL")
+    SECRET_KEY: str
+    DATABASE_URL: str = "sqlite:///./chucks_kitchen.db"
+    LOG_LEVEL: str = "INFO"
+
+    # SQLite tuning, applied to every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456 # 256 MB
+    SQLITE_CACHE_SIZE: int = -65536 # negative means KiB, so 64 MB per connection
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # INCREMENTAL lets the archive job hand freed pages back to the OS. It only takes
+    # effect on a new database, or after `python archive_orders.py --enable-incremental-vacuum`
+    SQLITE_AUTO_VACUUM: str = "INCREMENTAL"
+
+    # Connection pool (per engine). Keep it at least as big as the 40 thread
+    # threadpool that runs sync handlers, or they starve each other of connections.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 30
+    DB_POOL_TIMEOUT: int = 30
+
+    # Encode list responses with precompiled pydantic adapters, and everything else with
+    # orjson when installed (see app/utils/fast_json.py)
+    FAST_JSON: bool = False
+
+    # Requests slower than this are logged with the SQL they ran
+    SLOW_REQUEST_MS: int = 500
+
+    # Menu cache (GET /foods and GET /foods/{food_id})
+    MENU_CACHE_TTL_SECONDS: int = 300
+    MENU_CACHE_MAX_ENTRIES: int = 256
+    # Search results (GET /foods/search), one entry per distinct query; same TTL as the menu
+    SEARCH_CACHE_MAX_ENTRIES: int = 1024
+
+    # Cache-Control sent with menu and category reads (which also carry ETag/Last-Modified).
+    # The default makes clients revalidate every time, which is cheap: an unchanged menu is a 304.
+    # Behind a CDN something like "public, max-age=30, s-maxage=300" lets it absorb most traffic
+    MENU_CACHE_CONTROL: str = "public, no-cache"
+
+    # Password hashing (bcrypt runs on a dedicated, bounded pool)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 16
+
+    # Token-bucket limits for the auth routes, as "<count>/<second|minute|hour|day>".
+    # Applied per client IP and, where the body has one, per email
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    LOGIN_RATE_LIMIT_PER_IP: str = "20/minute"
+    LOGIN_RATE_LIMIT_PER_EMAIL: str = "10/minute"
+    REGISTER_RATE_LIMIT_PER_IP: str = "10/minute"
+    OTP_RATE_LIMIT_PER_IP: str = "20/minute"
+    OTP_RATE_LIMIT_PER_EMAIL: str = "10/minute"
+
+    # Cached identity (id, email, is_admin, is_verified) of logged-in users
+    IDENTITY_CACHE_TTL_SECONDS: int = 60
+    IDENTITY_CACHE_MAX_ENTRIES: int = 5000
+
+    # Verification codes ("memory" or "sqlite")
+    OTP_BACKEND: str = "memory"
+    OTP_TTL_SECONDS: int = 600
+    OTP_RESEND_COOLDOWN_SECONDS: int = 60
+    OTP_MAX_ATTEMPTS: int = 5
+    OTP_MAX_ENTRIES: int = 10000
+    # How often expired codes (and abandoned carts, see CART_TTL_SECONDS) are swept out
+    OTP_SWEEP_INTERVAL_SECONDS: int = 60
+
+    # Order archival: completed/cancelled orders older than this move to the archive tables,
+    # in transactions of ARCHIVE_BATCH_SIZE orders, every ARCHIVE_INTERVAL_SECONDS (0 = only
+    # when archive_orders.py is run)
+    ARCHIVE_AFTER_DAYS: int = 180
+    ARCHIVE_BATCH_SIZE: int = 500
+    ARCHIVE_INTERVAL_SECONDS: int = 3600
+
+    # Live order updates (SSE/WebSocket): events a client may fall behind by before it is
+    # disconnected, and how often an idle stream gets a heartbeat
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_HEARTBEAT_SECONDS: int = 15
+
+    # Server-side cart storage: "memory" (per process) or "sqlite" (cart_sessions table)
+    CART_BACKEND: str = "memory"
+    CART_TTL_SECONDS: int = 3600
+    CART_MAX_ENTRIES: int = 10000
 
     model_config = SettingsConfigDict(env_file=".env")
 
-settings = Settings()
\ No newline at end of file
+# Read once, when app.config is first imported. The engines, caches, stores and rate limiters
+# under app/ are built from it at import time as well; what create_app() and its lifespan put
+# off is database I/O (schema creation, seeding), not reading the configuration.
+settings = Settings()
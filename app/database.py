@@ -1,29 +1,192 @@
-from sqlalchemy import create_engine
+import logging
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# Define the SQLite URL
-# The 'check_same_thread' argument is specific to SQLite to allowFastAPIs
+from app.config import settings
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./chucks_kitchen.db"
+logger = logging.getLogger(__name__)
 
-# Initialize the Engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+# The database URL comes from Settings (DATABASE_URL), defaulting to ./chucks_kitchen.db
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+
+_url = make_url(SQLALCHEMY_DATABASE_URL)
+IS_SQLITE = _url.get_backend_name() == "sqlite"
+IS_SQLITE_MEMORY = IS_SQLITE and _url.database in (None, "", ":memory:")
+
+# Same database through the aiosqlite driver for the async engine
+ASYNC_SQLALCHEMY_DATABASE_URL = (
+    _url.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if IS_SQLITE else SQLALCHEMY_DATABASE_URL
 )
 
+def _engine_options() -> dict:
+    options = {}
+    if IS_SQLITE:
+        # The 'check_same_thread' argument is specific to SQLite to allow FastAPI's threadpool to share connections
+        options["connect_args"] = {"check_same_thread": False}
+    if not IS_SQLITE_MEMORY:
+        # In-memory SQLite uses a single-connection pool that doesn't take sizing options
+        options["pool_size"] = settings.DB_POOL_SIZE
+        options["max_overflow"] = settings.DB_MAX_OVERFLOW
+        options["pool_timeout"] = settings.DB_POOL_TIMEOUT
+    return options
+
+def _sqlite_pragmas() -> dict:
+    pragmas = {
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+    }
+    if not IS_SQLITE_MEMORY:
+        # WAL and mmap only make sense for a database file. auto_vacuum goes first:
+        # it has to be set before the first table is created
+        pragmas["auto_vacuum"] = settings.SQLITE_AUTO_VACUUM
+        pragmas["journal_mode"] = settings.SQLITE_JOURNAL_MODE
+        pragmas["mmap_size"] = settings.SQLITE_MMAP_SIZE
+    return pragmas
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Run on every new DBAPI connection, sync or aiosqlite."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in _sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+# Initialize the Engine
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options())
+
 # Session Maker
 # Use to create a new session for every request
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session maker (aiosqlite) for the async def read endpoints,
+# so they don't hold a threadpool slot while waiting on the database.
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **_engine_options())
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+if IS_SQLITE:
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+def log_database_profile():
+    """Log the effective database configuration, as reported by SQLite itself."""
+    logger.info("Database URL: %s", engine.url.render_as_string(hide_password=True))
+
+    if not IS_SQLITE_MEMORY:
+        logger.info(
+            "Connection pool: size=%s max_overflow=%s timeout=%ss",
+            settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, settings.DB_POOL_TIMEOUT
+        )
+
+    if IS_SQLITE:
+        with engine.connect() as connection:
+            effective = {
+                name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in _sqlite_pragmas()
+            }
+        logger.info("SQLite pragmas: %s", ", ".join(f"{name}={value}" for name, value in effective.items()))
+
 # Create the Declerative Base
 # Models (User, Food, Order) will inherit from this Base
 Base = declarative_base()
 
+# Bump this whenever a model, index or table changes, so init_db() re-runs schema creation
+SCHEMA_VERSION = 9
+
+# create_all only builds indexes for brand new tables,
+# so make sure indexes added to existing models also exist on older databases
+def ensure_indexes():
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+# create_all never alters existing tables either, so add columns that were added to a model later.
+# Only works for nullable columns without a server default, which is all a new column may be.
+def ensure_columns():
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    connection.exec_driver_sql(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                    )
+
+# Columns a model no longer has, dropped from older databases: {table: [column, ...]}
+RETIRED_COLUMNS = {
+    # Verification codes moved to otp_store (otp_codes table or memory)
+    "users": ["otp_code", "otp_expires_at"],
+}
+
+def drop_retired_columns():
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table, columns in RETIRED_COLUMNS.items():
+            if not inspector.has_table(table):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table)}
+            for column in columns:
+                if column in existing:
+                    connection.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN {column}")
+
+# Full-text index over foods.name/description used by GET /foods/search.
+# rowid is the food id; food_service.index_food keeps it in step with the foods table.
+def ensure_search_index():
+    with engine.begin() as connection:
+        if connection.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'foods_fts'").first():
+            return
+        connection.exec_driver_sql(
+            "CREATE VIRTUAL TABLE foods_fts USING fts5(name, description, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        # Index whatever is already on the menu
+        connection.exec_driver_sql(
+            "INSERT INTO foods_fts (rowid, name, description) SELECT id, name, coalesce(description, '') FROM foods"
+        )
+
+def init_db() -> bool:
+    """Create tables and indexes unless the database is already at SCHEMA_VERSION.
+
+    The version is kept in SQLite's user_version pragma, so a warm start costs one pragma read.
+    Returns True when the schema was (re)created.
+    """
+    # Every model module must be imported so Base.metadata knows about all tables
+    from app.models import cart, food, job_lock, order, otp, sales, user  # noqa: F401
+
+    if IS_SQLITE:
+        with engine.connect() as connection:
+            if connection.exec_driver_sql("PRAGMA user_version").scalar() == SCHEMA_VERSION:
+                return False
+
+    Base.metadata.create_all(bind=engine)
+    ensure_columns()
+    drop_retired_columns()
+    ensure_indexes()
+    if IS_SQLITE:
+        ensure_search_index()
+
+    if IS_SQLITE:
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return True
+
 # Dependency to get database seesion in API routes
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Async counterpart of get_db
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
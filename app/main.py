@@ -1,47 +1,139 @@
-from fastapi import FastAPI
-from starlette.middleware.sessions import SessionMiddleware
-from app.api import auth, foods, cart, orders
-from app.database import SessionLocal, engine, Base
-import os
-from dotenv import load_dotenv
-from app.config import settings
-
-from app.services.food_service import create_category
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
+from starlette.middleware.sessions import SessionMiddleware
 
-load_dotenv()
+from app.api import analytics, auth, foods, cart, kitchen, orders
+from app.config import settings
+from app.database import SessionLocal, engine, async_engine, init_db, log_database_profile
+from app.services import archive_service, auth_service, food_service, kitchen_service
+from app.services.cart_store import cart_store
+from app.services.order_events import order_events
+from app.services.otp_store import otp_store
+from app.utils.fast_json import FastJSONResponse
+from app.utils.metrics import MetricsMiddleware, format_metric, install_sql_hooks, metrics_registry
+from app.utils.rate_limit import limiter_metrics
+from app.utils.sweeper import PeriodicSweeper
 
+logger = logging.getLogger(__name__)
 
-# Create the database table on startup
-Base.metadata.create_all(bind=engine)
+# Categories every menu needs
+ESSENTIAL_CATEGORIES = ["Sides", "Main Dish", "Drinks", "Desserts"]
 
-app = FastAPI(title="Chucks Kitchen API")
-print("FastAPI app initialized")
 
-app.include_router(auth.router)
-app.include_router(foods.router)
-app.include_router(cart.router)
-app.include_router(orders.router)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Database work happens here, when the server starts, not when app.main is imported."""
+    if init_db():
+        logger.info("Database schema created/upgraded")
+    log_database_profile()
 
-@app.on_event("startup")
-def seed_data():
     db = SessionLocal()
     try:
-        categories = ["Sides", "Main Dish", "Drinks", "Desserts"]
-        for cat_name in categories:
-            create_category(db, name=cat_name)
-        print("✓ Essential categories seeded successfully.")
+        food_service.seed_categories(db, ESSENTIAL_CATEGORIES)
+        logger.info("✓ Essential categories seeded successfully.")
+        logger.info("Kitchen queue loaded with %d orders", kitchen_service.load_kitchen_queue(db))
     finally:
         db.close()
 
+    # Expired verification codes and abandoned carts are cleared in the background instead of on the request path
+    sweeper = PeriodicSweeper(
+        settings.OTP_SWEEP_INTERVAL_SECONDS,
+        jobs=[otp_store.purge_expired, cart_store.purge_expired],
+        name="expiry-sweeper"
+    )
+    sweeper.start()
+
+    # Old completed/cancelled orders move to the archive tables in the background
+    archiver = None
+    if settings.ARCHIVE_INTERVAL_SECONDS:
+        archiver = PeriodicSweeper(settings.ARCHIVE_INTERVAL_SECONDS, jobs=[archive_service.run_archive_job], name="order-archiver")
+        archiver.start()
+
+    # Order events are published from threadpool endpoints and delivered on this loop
+    order_events.bind(asyncio.get_running_loop())
+
+    yield
+
+    sweeper.stop()
+    if archiver is not None:
+        archiver.stop()
+    await async_engine.dispose()
+    engine.dispose()
+
+
+def _service_metrics():
+    cache = food_service.menu_cache.stats()
+    searches = food_service.search_cache.stats()
+    identities = auth_service.identity_cache.stats()
+    pool = auth_service.password_pool.stats()
+    events = order_events.stats()
+    kitchen = kitchen_service.kitchen_queue.stats()
+    return (
+        format_metric("menu_cache_hits_total", cache["hits"], "Menu cache hits", "counter")
+        + format_metric("menu_cache_misses_total", cache["misses"], "Menu cache misses", "counter")
+        + format_metric("menu_cache_entries", cache["size"], "Entries currently in the menu cache")
+        + format_metric("search_cache_hits_total", searches["hits"], "Menu searches served from cache", "counter")
+        + format_metric("search_cache_entries", searches["size"], "Entries currently in the search cache")
+        + format_metric("identity_cache_hits_total", identities["hits"], "Current-user lookups served from cache", "counter")
+        + format_metric("identity_cache_misses_total", identities["misses"], "Current-user lookups that hit the database", "counter")
+        + format_metric("order_event_subscribers", events["subscribers"], "Open order event streams")
+        + format_metric("order_events_published_total", events["published"], "Order events published", "counter")
+        + format_metric("order_event_evictions_total", events["evicted"], "Streams dropped for falling behind", "counter")
+        + format_metric("kitchen_queue_orders", kitchen["orders"], "Orders with dishes waiting in the kitchen queue")
+        + format_metric("kitchen_queue_portions", kitchen["quantity"], "Portions waiting in the kitchen queue")
+        + format_metric("password_pool_in_flight", pool["in_flight"], "bcrypt jobs running or queued")
+        + format_metric("password_pool_rejected_total", pool["rejected"], "bcrypt jobs rejected with 503", "counter")
+    )
+
+
+def create_app() -> FastAPI:
+    """Build the application. Cheap and free of I/O; see lifespan() for startup work."""
+    logging.basicConfig(level=settings.LOG_LEVEL, format="%(levelname)s:     %(name)s - %(message)s")
+
+    app = FastAPI(
+        title="Chucks Kitchen API",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse if settings.FAST_JSON else JSONResponse
+    )
+
+    app.include_router(auth.router)
+    app.include_router(foods.router)
+    app.include_router(cart.router)
+    app.include_router(orders.router)
+    app.include_router(kitchen.router)
+    app.include_router(analytics.router)
+
+    app.add_middleware(
+        SessionMiddleware,
+        secret_key=settings.SECRET_KEY,
+        session_cookie="chucks_cart_session",
+        max_age=3600 # Session expires after 1 hour
+    )
+
+    # Added last so it is the outermost middleware and times the whole request
+    app.add_middleware(MetricsMiddleware, slow_request_ms=settings.SLOW_REQUEST_MS)
+
+    # Count and time SQL per request on both database paths
+    install_sql_hooks(engine)
+    install_sql_hooks(async_engine.sync_engine)
+    metrics_registry.register_collector(_service_metrics)
+    metrics_registry.register_collector(limiter_metrics)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Request, SQL and cache metrics in the Prometheus text format."""
+        return Response(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+    @app.get("/")
+    def root():
+        return {"message": "Welcome to Chucks Kitchen API"}
+
+    return app
 
-app.add_middleware(
-    SessionMiddleware,
-    secret_key=settings.SECRET_KEY,
-    session_cookie="chucks_cart_session",
-    max_age=3600 # Session expires after 1 hour
-)
 
-@app.get("/")
-def root():
-    return {"message": "Welcome to Chucks Kitchen API"}
\ No newline at end of file
+# Module-level instance for `uvicorn app.main:app`
+app = create_app()
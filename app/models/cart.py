@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime, JSON
+from app.database import Base
+
+class CartSession(Base):
+    """Server-side cart storage used by the "sqlite" cart backend."""
+    __tablename__ = "cart_sessions"
+
+    # Random id kept in the session cookie instead of the cart itself
+    session_id = Column(String, primary_key=True)
+
+    # {"<food_id>": quantity, ...}
+    items = Column(JSON, nullable=False, default=dict)
+    expires_at = Column(DateTime, nullable=False, index=True)
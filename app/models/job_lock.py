@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database import Base
+
+class JobLock(Base):
+    """Leases that keep maintenance jobs from running over each other, across processes.
+
+    See archive_service.order_history_lock: archiving and the rollup rebuild both take it.
+    """
+    __tablename__ = "job_locks"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)
+
+    # A holder that died without releasing stops blocking others once this passes
+    expires_at = Column(DateTime, nullable=False)
+
+    # Set while analytics_service.rebuild_rollups holds the lock: live orders with ids in
+    # (read_to, read_until] haven't been read yet, so cancelling one must not subtract it
+    read_to = Column(Integer, nullable=True)
+    read_until = Column(Integer, nullable=True)
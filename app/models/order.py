@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, delete
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index, delete
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -19,12 +19,23 @@ class Order(Base):
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+    # Fetch server defaults (created_at) in the INSERT itself instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+    __table_args__ = (
+        # Serves the keyset-paginated order history (user_id, newest first)
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Serve the admin order browser (status and/or created_at range, newest first)
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_orders_created_at_id", "created_at", "id"),
+    )
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     food_id = Column(Integer, ForeignKey("foods.id"), nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
 
@@ -32,6 +43,44 @@ class OrderItem(Base):
     # If Admin updates food prices later
     unit_price = Column(Float, nullable=False)
 
+    # The food's category when ordered, so the sales rollups keep crediting the category that
+    # was counted at checkout even if the food moves later. NULL on items from older versions.
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+
     # Relationship
     order = relationship("Order", back_populates="items")
-    food = relationship("Food")
\ No newline at end of file
+    food = relationship("Food")
+
+# Completed and cancelled orders past ARCHIVE_AFTER_DAYS are moved here by archive_service,
+# keeping orders/order_items small. Rows keep their original ids; get_user_orders and the
+# order lookup read from here when a page reaches back far enough.
+
+class ArchivedOrder(Base):
+    __tablename__ = "archived_orders"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    items = relationship("ArchivedOrderItem", back_populates="order", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Same keyset pagination as the hot table
+        Index("ix_archived_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
+
+class ArchivedOrderItem(Base):
+    __tablename__ = "archived_order_items"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("archived_orders.id"), nullable=False, index=True)
+    food_id = Column(Integer, ForeignKey("foods.id"), nullable=False)
+    quantity = Column(Integer, nullable=False, default=1)
+    unit_price = Column(Float, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+
+    order = relationship("ArchivedOrder", back_populates="items")
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime, Integer
+from app.database import Base
+
+class OTPCode(Base):
+    """Pending verification codes used by the "sqlite" OTP backend."""
+    __tablename__ = "otp_codes"
+
+    # One live code per email; issuing a new one replaces it
+    email = Column(String, primary_key=True)
+    code = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    # Wrong guesses against this code, and when it was sent (for the resend cooldown)
+    attempts = Column(Integer, nullable=False, default=0)
+    sent_at = Column(DateTime, nullable=False)
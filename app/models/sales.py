@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey
+from app.database import Base
+
+# Daily sales rollups, kept up to date by order_service in the same transaction as the
+# order change (see analytics_service). Cancelled orders are subtracted back out.
+# backfill_rollups.py rebuilds both tables from order history.
+
+class DailyFoodSales(Base):
+    __tablename__ = "daily_food_sales"
+
+    day = Column(Date, primary_key=True)
+    food_id = Column(Integer, ForeignKey("foods.id"), primary_key=True)
+
+    # Orders containing the food, units sold and revenue (quantity * unit_price)
+    orders = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+class DailyCategorySales(Base):
+    __tablename__ = "daily_category_sales"
+
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+
+    orders = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
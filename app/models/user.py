@@ -14,10 +14,8 @@ class User(Base):
     # Logic for Admin and Customer
     is_admin = Column(Boolean, default=False)
 
-    # Logic for OTP Verification
+    # Logic for OTP Verification (pending codes live in otp_store)
     is_verified = Column(Boolean, default=False)
-    otp_code = Column(String, nullable=True)
-    otp_expires_at = Column(DateTime, nullable=True)
 
     # Referral code
     referral_code = Column(String(8), unique=True, index=True, nullable=True)
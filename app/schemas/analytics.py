@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import date
+
+# Revenue and units sold on one day
+class DailySalesOut(BaseModel):
+    day: date
+    quantity: int
+    revenue: float
+
+class FoodSalesOut(BaseModel):
+    food_id: int
+    name: str
+    orders: int
+    quantity: int
+    revenue: float
+
+class CategorySalesOut(BaseModel):
+    category_id: int
+    name: str
+    orders: int
+    quantity: int
+    revenue: float
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class FoodBase(BaseModel):
     name: str
@@ -18,6 +18,11 @@ class FoodOut(FoodBase):
     class Config:
         from_attributes = True
 
+# Autocomplete entry: just enough to show a suggestion and link to the item
+class FoodSuggestion(BaseModel):
+    id: int
+    name: str
+
 class FoodUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
@@ -25,6 +30,19 @@ class FoodUpdate(BaseModel):
     is_available: Optional[bool] = None
     category_id: Optional[int] = None
 
+# Result of a bulk menu import (POST /foods/import)
+class FoodImportError(BaseModel):
+    row: int  # 1-based data row (the CSV header line isn't counted)
+    name: Optional[str] = None
+    errors: List[str]
+
+class FoodImportReport(BaseModel):
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[FoodImportError] = []
+    errors_truncated: bool = False
+
 # Schema for Category
 class CategoryOut(BaseModel):
     id: int
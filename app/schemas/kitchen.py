@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+# One order's share of a kitchen batch
+class KitchenBatchOrder(BaseModel):
+    order_id: int
+    quantity: int
+
+# Every waiting portion of one dish, across orders
+class KitchenBatch(BaseModel):
+    food_id: int
+    name: Optional[str] = None
+    quantity: int
+    orders: List[KitchenBatchOrder]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 
 # Schema for an individual item inside an order
@@ -21,4 +21,27 @@ class OrderOut(BaseModel):
     items: List[OrderItemOut] #This nest the items inside the order response
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# One page of orders plus the cursor to pass back for the next page
+class OrderPage(BaseModel):
+    orders: List[OrderOut]
+    next_cursor: Optional[str] = None
+
+# Move many orders to one status in a single request
+class OrderStatusBulkUpdate(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    status: str
+
+# What happened to one order of a bulk update
+class OrderStatusResult(BaseModel):
+    order_id: int
+    updated: bool
+    previous_status: Optional[str] = None
+    status: Optional[str] = None
+    detail: Optional[str] = None
+
+class OrderStatusBulkResult(BaseModel):
+    updated: int
+    failed: int
+    results: List[OrderStatusResult]
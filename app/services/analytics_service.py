@@ -0,0 +1,236 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, desc, func, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.models.food import Category, Food
+from app.models.job_lock import JobLock
+from app.models.order import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from app.models.sales import DailyCategorySales, DailyFoodSales
+from app.services.archive_service import ORDER_HISTORY_LOCK, order_history_lock
+from app.utils.clock import utcnow
+
+# Analytics queries cover the last 30 days unless asked otherwise, and never more than a year
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+
+
+def _upsert_rollup(db: Session, model, key_column: str, rows: list[dict]):
+    """Add each row's orders/quantity/revenue onto its (day, key) bucket, creating it if needed."""
+    if not rows:
+        return
+    statement = insert(model)
+    statement = statement.on_conflict_do_update(
+        index_elements=[model.day, getattr(model, key_column)],
+        set_={
+            "orders": model.orders + statement.excluded["orders"],
+            "quantity": model.quantity + statement.excluded["quantity"],
+            "revenue": model.revenue + statement.excluded["revenue"],
+        }
+    )
+    db.execute(statement, rows)
+
+
+def apply_sales(db: Session, day: date, lines: list[tuple[int, int, int, float]], sign: int = 1):
+    """Add (sign=1) or take back (sign=-1) one order's lines in the rollups.
+
+    `lines` are (food_id, category_id, quantity, unit_price). Runs in the caller's transaction,
+    so the rollups commit or roll back together with the order change.
+    """
+    foods = defaultdict(lambda: [0, 0.0])
+    categories = defaultdict(lambda: [0, 0.0])
+    for food_id, category_id, quantity, unit_price in lines:
+        for totals in (foods[food_id], categories[category_id]):
+            totals[0] += quantity
+            totals[1] += quantity * unit_price
+
+    # Each food/category counts the order once, however many lines it has in it
+    _upsert_rollup(db, DailyFoodSales, "food_id", [
+        {"day": day, "food_id": food_id, "orders": sign, "quantity": sign * quantity, "revenue": sign * revenue}
+        for food_id, (quantity, revenue) in foods.items()
+    ])
+    _upsert_rollup(db, DailyCategorySales, "category_id", [
+        {"day": day, "category_id": category_id, "orders": sign, "quantity": sign * quantity, "revenue": sign * revenue}
+        for category_id, (quantity, revenue) in categories.items()
+    ])
+
+
+def reverse_order_sales(db: Session, order: Order):
+    """Take a cancelled order back out of the rollups (in the caller's transaction).
+
+    Lines come off the category stored on each item at checkout, the one create_order counted
+    (items from before categories were stored fall back to the food's current one, like the rebuild).
+    An order a running rebuild hasn't read yet isn't in the rollups, and the rebuild skips it
+    once it's cancelled, so there's nothing to take back.
+    """
+    if _rebuild_will_read(db, order.id):
+        return
+    lines = db.execute(
+        select(OrderItem.food_id, _item_category(OrderItem), OrderItem.quantity, OrderItem.unit_price)
+        .join(Food, Food.id == OrderItem.food_id)
+        .where(OrderItem.order_id == order.id)
+    ).all()
+    apply_sales(db, _order_day(order.created_at), lines, sign=-1)
+
+
+def _item_category(item_model):
+    """The category an order line was sold under (needs a join to Food for items stored without one)."""
+    return func.coalesce(item_model.category_id, Food.category_id)
+
+
+def _rebuild_will_read(db: Session, order_id: int) -> bool:
+    return db.scalar(
+        select(JobLock.name).where(
+            JobLock.name == ORDER_HISTORY_LOCK,
+            JobLock.read_to < order_id,
+            JobLock.read_until >= order_id,
+            JobLock.expires_at > utcnow(),
+        )
+    ) is not None
+
+
+def _mark_read(db: Session, lock, **progress):
+    """Record how far the rebuild got in its lock row, in the batch's own transaction."""
+    db.execute(
+        update(JobLock).where(JobLock.name == lock.name, JobLock.holder == lock.holder).values(**progress)
+    )
+
+
+def _order_day(created_at: datetime) -> date:
+    # created_at is stored in UTC, so days are UTC days
+    return created_at.date()
+
+
+def rebuild_rollups(db: Session, batch_size: int = 5000, progress=None) -> int:
+    """Recompute both rollup tables from order history. Returns how many orders were read.
+
+    Orders (live, then archived) are aggregated in SQL, `batch_size` order ids at a time, one
+    transaction per batch. Orders placed while this runs are counted by create_order as usual:
+    the tables are cleared in the same transaction that fixes the last order id the rebuild
+    will read. Each batch records the last live order id it read in the lock row, so cancelling
+    an order it hasn't reached yet doesn't subtract it (see reverse_order_sales).
+    Holds order_history_lock, so nothing is archived meanwhile (JobBusy if archiving is already
+    running).
+    """
+    with order_history_lock() as lock:
+        with db.begin():
+            last_ids = {
+                (Order, OrderItem): db.scalar(select(func.max(Order.id))) or 0,
+                (ArchivedOrder, ArchivedOrderItem): db.scalar(select(func.max(ArchivedOrder.id))) or 0,
+            }
+            db.execute(delete(DailyFoodSales))
+            db.execute(delete(DailyCategorySales))
+            _mark_read(db, lock, read_to=0, read_until=last_ids[(Order, OrderItem)])
+
+        orders_read = 0
+        for (order_model, item_model), last_order_id in last_ids.items():
+            orders_read += _rollup_orders(db, order_model, item_model, last_order_id, batch_size, progress, lock)
+    return orders_read
+
+
+def _rollup_orders(db: Session, order_model, item_model, last_order_id: int, batch_size: int, progress, lock) -> int:
+    day = func.date(order_model.created_at)
+    category_id = _item_category(item_model)
+    revenue = func.sum(item_model.quantity * item_model.unit_price)
+    orders_read = 0
+    start = 0
+    while start < last_order_id:
+        end = min(start + batch_size, last_order_id)
+        in_batch = (order_model.id > start, order_model.id <= end, order_model.status != "cancelled")
+
+        with db.begin():
+            food_rows = db.execute(
+                select(day, item_model.food_id, func.count(func.distinct(order_model.id)), func.sum(item_model.quantity), revenue)
+                .join(item_model, item_model.order_id == order_model.id)
+                .where(*in_batch)
+                .group_by(day, item_model.food_id)
+            ).all()
+            category_rows = db.execute(
+                select(day, category_id, func.count(func.distinct(order_model.id)), func.sum(item_model.quantity), revenue)
+                .join(item_model, item_model.order_id == order_model.id)
+                .join(Food, Food.id == item_model.food_id)
+                .where(*in_batch)
+                .group_by(day, category_id)
+            ).all()
+
+            _upsert_rollup(db, DailyFoodSales, "food_id", [
+                {"day": date.fromisoformat(d), "food_id": key, "orders": n, "quantity": q, "revenue": r}
+                for d, key, n, q, r in food_rows
+            ])
+            _upsert_rollup(db, DailyCategorySales, "category_id", [
+                {"day": date.fromisoformat(d), "category_id": key, "orders": n, "quantity": q, "revenue": r}
+                for d, key, n, q, r in category_rows
+            ])
+            orders_read += db.scalar(select(func.count()).select_from(order_model).where(*in_batch))
+            if order_model is Order:
+                _mark_read(db, lock, read_to=end)
+
+        start = end
+        if progress:
+            progress(end, last_order_id)
+        lock.renew()
+
+    return orders_read
+
+
+def resolve_range(date_from: date | None, date_to: date | None) -> tuple[date, date]:
+    """Default to the last DEFAULT_RANGE_DAYS days (UTC), inclusive on both ends."""
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range is limited to {MAX_RANGE_DAYS} days"
+        )
+    return date_from, date_to
+
+
+def daily_sales(db: Session, date_from: date, date_to: date) -> list[dict]:
+    """Revenue and units sold per day (days without sales are left out)."""
+    rows = db.execute(
+        select(DailyCategorySales.day, func.sum(DailyCategorySales.quantity), func.sum(DailyCategorySales.revenue))
+        .where(DailyCategorySales.day.between(date_from, date_to))
+        .group_by(DailyCategorySales.day)
+        .order_by(DailyCategorySales.day)
+    ).all()
+    return [{"day": day, "quantity": quantity, "revenue": round(revenue, 2)} for day, quantity, revenue in rows]
+
+
+def food_sales(db: Session, date_from: date, date_to: date, limit: int = 20) -> list[dict]:
+    """Best-selling foods by revenue over the range."""
+    revenue = func.sum(DailyFoodSales.revenue).label("revenue")
+    rows = db.execute(
+        select(DailyFoodSales.food_id, Food.name, func.sum(DailyFoodSales.orders),
+               func.sum(DailyFoodSales.quantity), revenue)
+        .join(Food, Food.id == DailyFoodSales.food_id)
+        .where(DailyFoodSales.day.between(date_from, date_to))
+        .group_by(DailyFoodSales.food_id)
+        .order_by(desc(revenue))
+        .limit(limit)
+    ).all()
+    return [
+        {"food_id": food_id, "name": name, "orders": orders, "quantity": quantity, "revenue": round(total, 2)}
+        for food_id, name, orders, quantity, total in rows
+    ]
+
+
+def category_sales(db: Session, date_from: date, date_to: date) -> list[dict]:
+    """Sales per category over the range, by revenue."""
+    revenue = func.sum(DailyCategorySales.revenue).label("revenue")
+    rows = db.execute(
+        select(DailyCategorySales.category_id, Category.name, func.sum(DailyCategorySales.orders),
+               func.sum(DailyCategorySales.quantity), revenue)
+        .join(Category, Category.id == DailyCategorySales.category_id)
+        .where(DailyCategorySales.day.between(date_from, date_to))
+        .group_by(DailyCategorySales.category_id)
+        .order_by(desc(revenue))
+    ).all()
+    return [
+        {"category_id": category_id, "name": name, "orders": orders, "quantity": quantity, "revenue": round(total, 2)}
+        for category_id, name, orders, quantity, total in rows
+    ]
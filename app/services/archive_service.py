@@ -0,0 +1,194 @@
+import logging
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import String, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import IS_SQLITE, SessionLocal, engine
+from app.models.job_lock import JobLock
+from app.models.order import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from app.utils.clock import utcnow
+from app.utils.pagination import sqlite_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Only orders nothing can happen to any more are archived
+ARCHIVED_STATUSES = ("completed", "cancelled")
+
+# Free pages are returned this many at a time, so no single step holds the write lock for long
+VACUUM_STEP_PAGES = 2000
+
+# Held by archive_orders and analytics_service.rebuild_rollups, renewed after every batch
+ORDER_HISTORY_LOCK = "order-history"
+JOB_LOCK_TTL = timedelta(minutes=10)
+
+_ORDER_COLUMNS = ("id", "user_id", "total_amount", "status", "created_at")
+_ITEM_COLUMNS = ("id", "order_id", "food_id", "quantity", "unit_price", "category_id")
+
+
+class JobBusy(RuntimeError):
+    """Another process holds the job lock."""
+
+
+class JobLease:
+    """One holder's claim on a job_locks row, valid for JOB_LOCK_TTL unless renewed."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.holder = uuid.uuid4().hex
+
+    def acquire(self) -> bool:
+        now = utcnow()
+        statement = sqlite_insert(JobLock).values(name=self.name, holder=self.holder, expires_at=now + JOB_LOCK_TTL)
+        statement = statement.on_conflict_do_update(
+            index_elements=[JobLock.name],
+            set_={"holder": statement.excluded.holder, "expires_at": statement.excluded.expires_at},
+            where=JobLock.expires_at < now
+        )
+        with engine.begin() as connection:
+            connection.execute(statement)
+            return connection.scalar(select(JobLock.holder).where(JobLock.name == self.name)) == self.holder
+
+    def renew(self):
+        """Push the expiry out again. Raises JobBusy if the lease ran out and someone else took it."""
+        with engine.begin() as connection:
+            renewed = connection.execute(
+                update(JobLock)
+                .where(JobLock.name == self.name, JobLock.holder == self.holder)
+                .values(expires_at=utcnow() + JOB_LOCK_TTL)
+            ).rowcount
+        if not renewed:
+            raise JobBusy(f"Lost the {self.name!r} lock")
+
+    def release(self):
+        with engine.begin() as connection:
+            connection.execute(delete(JobLock).where(JobLock.name == self.name, JobLock.holder == self.holder))
+
+
+@contextmanager
+def order_history_lock():
+    """Hold the lock shared by archiving and the rollup rebuild, in any process.
+
+    Both work across the orders and archive tables in many transactions; an order moved to
+    the archive halfway through a rebuild would be counted twice or not at all. Raises JobBusy
+    when the other job is running. Yields the JobLease, to renew() between batches.
+    """
+    lease = JobLease(ORDER_HISTORY_LOCK)
+    if not lease.acquire():
+        raise JobBusy("Orders are being archived or the sales rollups rebuilt; try again once that has finished")
+    try:
+        yield lease
+    finally:
+        lease.release()
+
+
+def archive_cutoff(older_than_days: int | None = None) -> datetime:
+    """Orders created before this (naive UTC, like created_at) are old enough to archive."""
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    return utcnow() - timedelta(days=days)
+
+
+def archive_orders(db: Session, older_than_days: int | None = None, batch_size: int | None = None, progress=None) -> int:
+    """Move old completed/cancelled orders and their items to the archive tables.
+
+    Works `batch_size` orders per transaction (copy, then delete), so writers are never held
+    up for long. Holds order_history_lock throughout (JobBusy if a rollup rebuild has it).
+    Returns how many orders were moved.
+    """
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    cutoff = literal(sqlite_timestamp(archive_cutoff(older_than_days)), String)
+
+    with order_history_lock() as lock:
+        # Never move the newest order: SQLite would hand its id to the next order placed
+        with db.begin():
+            newest_id = db.scalar(select(func.max(Order.id))) or 0
+
+        moved = 0
+        while True:
+            with db.begin():
+                order_ids = db.scalars(
+                    select(Order.id)
+                    .where(Order.status.in_(ARCHIVED_STATUSES), Order.created_at < cutoff, Order.id < newest_id)
+                    .order_by(Order.id)
+                    .limit(batch_size)
+                ).all()
+                if not order_ids:
+                    break
+
+                db.execute(insert(ArchivedOrder).from_select(
+                    _ORDER_COLUMNS,
+                    select(*(getattr(Order, column) for column in _ORDER_COLUMNS)).where(Order.id.in_(order_ids))
+                ))
+                db.execute(insert(ArchivedOrderItem).from_select(
+                    _ITEM_COLUMNS,
+                    select(*(getattr(OrderItem, column) for column in _ITEM_COLUMNS)).where(OrderItem.order_id.in_(order_ids))
+                ))
+                db.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+                db.execute(delete(Order).where(Order.id.in_(order_ids)))
+
+            moved += len(order_ids)
+            if progress:
+                progress(moved)
+            lock.renew()
+
+    return moved
+
+
+def compact_database() -> int:
+    """Return free pages to the OS with incremental vacuum. Returns how many pages were freed.
+
+    Does nothing unless the database uses auto_vacuum=INCREMENTAL (see enable_incremental_vacuum).
+    """
+    if not IS_SQLITE:
+        return 0
+
+    raw = engine.raw_connection()
+    try:
+        connection = raw.driver_connection
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            logger.warning(
+                "auto_vacuum is not INCREMENTAL, archived orders' space is only reused, not freed. "
+                "Run `python archive_orders.py --enable-incremental-vacuum` once to switch it on."
+            )
+            return 0
+
+        start = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        remaining = start
+        while remaining:
+            # executescript, not execute: sqlite3 only steps a PRAGMA once, which frees a single page
+            connection.executescript(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})")
+            freed_to = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            if freed_to >= remaining:
+                break
+            remaining = freed_to
+        return start - remaining
+    finally:
+        raw.close()
+
+
+def enable_incremental_vacuum():
+    """Switch an existing database to auto_vacuum=INCREMENTAL. Runs a full VACUUM, so take the app down first."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.exec_driver_sql("VACUUM")
+
+
+def run_archive_job() -> int:
+    """One scheduled pass: archive what is due, then compact. For PeriodicSweeper."""
+    db = SessionLocal()
+    try:
+        moved = archive_orders(db)
+    except JobBusy:
+        logger.info("Skipped archiving, the order history lock is taken")
+        return 0
+    finally:
+        db.close()
+
+    if moved:
+        pages = compact_database()
+        logger.info("Archived %d orders, freed %d pages", moved, pages)
+    return moved
@@ -1,29 +1,110 @@
 import bcrypt
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
-from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.config import settings
 from fastapi import Request
-from app.database import get_db
+from starlette.requests import HTTPConnection
+from app.database import AsyncSessionLocal, get_async_db, get_db
 
 from app.models.user import User
-from app.utils import otp
-from app.utils.otp import generate_otp, verify_otp
+from app.services.otp_store import OTPThrottled, otp_store
+from app.utils.cache import TTLCache
 from app.utils.referral import generate_referral_code, validate_referral_code
+from app.utils.worker_pool import BoundedWorkerPool, PoolSaturated
 
 
-def get_current_user(request: Request, db: Session = Depends(get_db)):
+@dataclass(frozen=True)
+class CurrentUser:
+    """What authenticated endpoints need to know about the caller, cached between requests."""
+    id: int
+    email: str
+    is_admin: bool
+    is_verified: bool
+
+# Most authenticated traffic comes from the same few thousand users, so their identity is
+# cached for a short TTL instead of re-reading the users row on every request.
+# Code in the server that changes is_admin or is_verified must call invalidate_user_identity().
+# The cache is per process: changes made elsewhere (promote.py, another worker, a manual
+# UPDATE) are only seen once the entry expires, so IDENTITY_CACHE_TTL_SECONDS bounds how
+# long a demoted admin keeps their rights.
+identity_cache = TTLCache(
+    ttl_seconds=settings.IDENTITY_CACHE_TTL_SECONDS,
+    max_entries=settings.IDENTITY_CACHE_MAX_ENTRIES
+)
+
+def invalidate_user_identity(user_id: int):
+    identity_cache.delete(user_id)
+
+def _cache_identity(user: User) -> CurrentUser:
+    identity = CurrentUser(id=user.id, email=user.email, is_admin=user.is_admin, is_verified=user.is_verified)
+    identity_cache.set(user.id, identity)
+    return identity
+
+def get_current_user(request: Request, db: Session = Depends(get_db)) -> CurrentUser:
     user_id = request.session.get("user_id")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+
+    cached = identity_cache.get(user_id)
+    if cached is not None:
+        return cached
     
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     
-    return user
+    return _cache_identity(user)
+
+async def get_current_user_async(request: Request, db: AsyncSession = Depends(get_async_db)) -> CurrentUser:
+    """Same as get_current_user, for async def endpoints on the async database path."""
+    user_id = request.session.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+
+    cached = identity_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    return _cache_identity(user)
+
+async def load_identity_async(user_id: int) -> CurrentUser | None:
+    """Identity for a user id, from the cache or a short-lived session of its own."""
+    cached = identity_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+    return _cache_identity(user) if user else None
+
+async def get_stream_user(connection: HTTPConnection) -> CurrentUser:
+    """Current user for long-lived streams (SSE).
+
+    Unlike get_current_user_async it takes no request-scoped session, which would stay
+    open (and hold a pooled connection) for as long as the stream does.
+    """
+    user_id = connection.session.get("user_id")
+    identity = await load_identity_async(user_id) if user_id else None
+    if identity is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return identity
+
+async def get_stream_admin(current_user: CurrentUser = Depends(get_stream_user)) -> CurrentUser:
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required. You do not have permission to perform this action"
+        )
+    return current_user
 
-def get_admin_user(current_user: User = Depends(get_current_user)):
+def get_admin_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Verify current user is admin"""
     if not current_user.is_admin:
         raise HTTPException(
@@ -33,13 +114,43 @@ def get_admin_user(current_user: User = Depends(get_current_user)):
     
     return current_user
 
-def get_password_hash(password: str) -> str:
+# bcrypt is deliberately slow, so it gets its own small pool instead of running on
+# whichever request thread happens to handle a login. When the pool is full we answer
+# 503 right away rather than letting logins pile up and starve the rest of the API.
+# The login and register endpoints are async and await the pool (the *_async helpers),
+# so a request waiting on bcrypt doesn't hold a threadpool thread either.
+password_pool = BoundedWorkerPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_LIMIT,
+    name="bcrypt"
+)
+
+def _pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please try again shortly",
+        headers={"Retry-After": "1"}
+    )
+
+def _run_password_job(fn, *args):
+    try:
+        return password_pool.run(fn, *args)
+    except PoolSaturated:
+        raise _pool_busy()
+
+async def _run_password_job_async(fn, *args):
+    try:
+        return await password_pool.run_async(fn, *args)
+    except PoolSaturated:
+        raise _pool_busy()
+
+def _hash_password(password: str) -> str:
     pwd_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(pwd_bytes, salt)
     return hashed.decode('utf-8')
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _check_password(plain_password: str, hashed_password: str) -> bool:
     try:
         pwd_bytes = plain_password.encode('utf-8')
         hashed_bytes = hashed_password.encode('utf-8')
@@ -47,9 +158,38 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     except Exception:
         return False
 
+def get_password_hash(password: str) -> str:
+    return _run_password_job(_hash_password, password)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _run_password_job(_check_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_password_job_async(_hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_job_async(_check_password, plain_password, hashed_password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with a different cost factor than BCRYPT_ROUNDS."""
+    # bcrypt hashes look like $2b$12$<salt+hash>, the middle part being the cost
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+async def rehash_password_if_needed_async(db: AsyncSession, user: User, plain_password: str):
+    """Upgrade a user's hash to the current cost factor. Call only after a successful login."""
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash_async(plain_password)
+        await db.commit()
+
 def get_user_by_email(db: Session, email: str) -> User | None:
     return db.query(User).filter(User.email == email).first()
 
+async def get_user_by_email_async(db: AsyncSession, email: str) -> User | None:
+    return (await db.scalars(select(User).where(User.email == email))).first()
+
 def get_user_by_id(db: Session, user_id: int):
     # Find user by ID
     return db.query(User).filter(User.id == user_id).first()
@@ -58,16 +198,13 @@ def register_user(
         db: Session,
         email: str,
         phone: str,
-        password: str,
+        hashed_password: str,
         referral_code: str = None
 ):
-    """Registers a new user, hashes password, genertes OTP and referral codes"""
+    """Registers a new user, genertes OTP and referral codes.
 
-    hashed_password = get_password_hash(password)
-
-    # This generates OTP and set expiration (e.g 10 min from now)
-    otp = generate_otp()
-    expires_at = datetime.now(timezone.utc) + timedelta(minutes=10)
+    The password is hashed beforehand (get_password_hash_async), off the request thread.
+    """
 
     # Generate a unique referral code for new user
     new_referral = generate_referral_code()
@@ -80,8 +217,6 @@ def register_user(
         phone=phone,
         hashed_password=hashed_password,
         is_admin=is_first_user,
-        otp_code=otp,
-        otp_expires_at=expires_at,
         referral_code=new_referral
     )
 
@@ -95,6 +230,9 @@ def register_user(
     db.commit()
     db.refresh(new_user)
 
+    # The code lives in the OTP store (expires after OTP_TTL_SECONDS), not on the users row
+    otp = _issue_otp(email)
+
     #return the OTP alongside the user 
     return new_user, otp
 
@@ -104,15 +242,13 @@ def verify_email(db: Session, email: str, otp_code: str) -> bool:
     if not user:
         return False
     
-    # Utility function to check the code and expiration
-    if verify_otp(user.otp_code, otp_code, user.otp_expires_at):
+    # The store checks the code and expiry, and consumes it on success so it can't be reused
+    if _check_otp(email, otp_code):
         #update user status
         user.is_verified = True
-        #Clear OTP data so it can't be reused
-        user.otp_code = None
-        user.otp_expires_at = None
 
         db.commit()
+        invalidate_user_identity(user.id)
         return True
 
     return False
@@ -123,16 +259,26 @@ def resend_verification_otp(db: Session, email: str) -> str | None:
     if not user:
         return None
     if user.is_verified:
-        return "User already verified"
+        return "already_verified"
     
-    # Generate new OTP and expiration
-    new_otp = generate_otp()
-    expires_at = datetime.now(timezone.utc) + timedelta(minutes=10)
+    # Generate new OTP, unless one was sent within OTP_RESEND_COOLDOWN_SECONDS
+    return _issue_otp(email)
 
-    # Update user record
-    user.otp_code = new_otp
-    user.otp_expires_at = expires_at
+def _otp_throttled(exc: OTPThrottled) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=exc.detail,
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
-    db.commit()
+def _issue_otp(email: str) -> str:
+    try:
+        return otp_store.issue(email)
+    except OTPThrottled as exc:
+        raise _otp_throttled(exc)
 
-    return new_otp
\ No newline at end of file
+def _check_otp(email: str, otp_code: str) -> bool:
+    try:
+        return otp_store.verify(email, otp_code)
+    except OTPThrottled as exc:
+        raise _otp_throttled(exc)
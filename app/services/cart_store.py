@@ -0,0 +1,110 @@
+import secrets
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.cart import CartSession
+from app.utils.cache import TTLCache
+from app.utils.clock import utcnow
+
+
+class CartStore(ABC):
+    """Where carts live. The session cookie only carries the cart id.
+
+    Carts are dicts of {"<food_id>": quantity}, same shape as the old session cart.
+    """
+
+    @abstractmethod
+    def get(self, cart_id: str) -> dict:
+        ...
+
+    @abstractmethod
+    def save(self, cart_id: str, cart: dict) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, cart_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Delete expired carts and return how many were removed."""
+
+
+class MemoryCartStore(CartStore):
+    """Per-process store with TTL expiry and LRU eviction. Carts are lost on restart."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self._carts = TTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+    def get(self, cart_id: str) -> dict:
+        # Hand out a copy so callers can't change the stored cart without saving it
+        return dict(self._carts.get(cart_id, {}))
+
+    def save(self, cart_id: str, cart: dict) -> None:
+        self._carts.set(cart_id, dict(cart))
+
+    def delete(self, cart_id: str) -> None:
+        self._carts.delete(cart_id)
+
+    def purge_expired(self) -> int:
+        return self._carts.purge_expired()
+
+
+class SQLiteCartStore(CartStore):
+    """Stores carts in the cart_sessions table, so they survive restarts and are shared by workers."""
+
+    def __init__(self, ttl_seconds: int, session_factory=SessionLocal):
+        self.ttl_seconds = ttl_seconds
+        self._session_factory = session_factory
+
+    def get(self, cart_id: str) -> dict:
+        with self._session_factory() as db:
+            row = db.execute(
+                select(CartSession.items).where(
+                    CartSession.session_id == cart_id,
+                    CartSession.expires_at > utcnow()
+                )
+            ).first()
+            return dict(row.items) if row else {}
+
+    def save(self, cart_id: str, cart: dict) -> None:
+        expires_at = utcnow() + timedelta(seconds=self.ttl_seconds)
+        statement = insert(CartSession).values(session_id=cart_id, items=cart, expires_at=expires_at)
+        statement = statement.on_conflict_do_update(
+            index_elements=[CartSession.session_id],
+            set_={"items": statement.excluded["items"], "expires_at": statement.excluded["expires_at"]}
+        )
+        with self._session_factory() as db:
+            db.execute(statement)
+            db.commit()
+
+    def delete(self, cart_id: str) -> None:
+        with self._session_factory() as db:
+            db.execute(delete(CartSession).where(CartSession.session_id == cart_id))
+            db.commit()
+
+    def purge_expired(self) -> int:
+        with self._session_factory() as db:
+            result = db.execute(delete(CartSession).where(CartSession.expires_at <= utcnow()))
+            db.commit()
+            return result.rowcount
+
+
+def new_cart_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+def _build_cart_store() -> CartStore:
+    if settings.CART_BACKEND == "sqlite":
+        return SQLiteCartStore(ttl_seconds=settings.CART_TTL_SECONDS)
+    if settings.CART_BACKEND == "memory":
+        return MemoryCartStore(ttl_seconds=settings.CART_TTL_SECONDS, max_entries=settings.CART_MAX_ENTRIES)
+    raise ValueError(f"Unknown CART_BACKEND '{settings.CART_BACKEND}', expected 'memory' or 'sqlite'")
+
+
+cart_store = _build_cart_store()
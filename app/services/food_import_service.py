@@ -0,0 +1,176 @@
+import csv
+import io
+import json
+from typing import BinaryIO, Iterator
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.food import Category, Food
+from app.schemas.food import FoodCreate, FoodImportError, FoodImportReport
+from app.services.food_service import index_foods, invalidate_menu_cache
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+# Keep the response small when a whole file is bad; the failed count stays exact
+MAX_REPORTED_ERRORS = 1000
+
+# Filled in for new foods when a row leaves the optional columns out (existing foods keep theirs)
+_NEW_FOOD_DEFAULTS = {name: field.default for name, field in FoodCreate.model_fields.items() if not field.is_required()}
+
+
+def import_format_for(filename: str | None, requested: str | None) -> str:
+    """The explicit ?format=, else a guess from the file extension."""
+    if requested:
+        return requested
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension == "csv":
+        return "csv"
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Can't tell the file format, name it .csv/.jsonl or pass ?format=csv|jsonl"
+    )
+
+
+def import_foods(db: Session, stream: BinaryIO, import_format: str, batch_size: int = 500) -> FoodImportReport:
+    """Create or update menu items from a CSV or JSON Lines upload.
+
+    Rows are read one at a time from `stream`, validated against FoodCreate and written in
+    batches of `batch_size`, one transaction each. A row whose name matches an existing food
+    updates it (the oldest one, if names repeat); otherwise it creates a new food. Rows name
+    their category with either `category_id` or `category` (its name, case-insensitive).
+    Invalid rows are skipped and listed in the report.
+    """
+    categories = {name.lower(): category_id for category_id, name in db.execute(select(Category.id, Category.name))}
+    category_ids = set(categories.values())
+
+    report = FoodImportReport()
+    batch: dict[str, dict] = {}  # name -> supplied columns; a later row with the same name wins
+
+    for row_number, raw, error in _read_rows(stream, import_format):
+        if error is None:
+            try:
+                food = FoodCreate.model_validate(_normalize(raw, categories, category_ids))
+            except ValidationError as exc:
+                error = [f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in exc.errors()]
+            except ValueError as exc:
+                error = [str(exc)]
+
+        if error is not None:
+            report.failed += 1
+            if len(report.errors) < MAX_REPORTED_ERRORS:
+                name = _row_name(raw)
+                report.errors.append(FoodImportError(row=row_number, name=name, errors=error))
+            else:
+                report.errors_truncated = True
+            continue
+
+        batch[food.name] = {**batch.get(food.name, {}), **food.model_dump(exclude_unset=True)}
+        if len(batch) >= batch_size:
+            _write_batch(db, batch, report)
+            batch = {}
+
+    if batch:
+        _write_batch(db, batch, report)
+    if report.created or report.updated:
+        invalidate_menu_cache()
+    return report
+
+
+def _read_rows(stream: BinaryIO, import_format: str) -> Iterator[tuple[int, dict | None, list[str] | None]]:
+    """Yield (row number, row, parse error) without reading the whole file into memory."""
+    # utf-8-sig drops the BOM spreadsheet exports like to start with
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    row_number = 0
+    try:
+        if import_format == "csv":
+            for row_number, row in enumerate(csv.DictReader(text), start=1):
+                if None in row:
+                    yield row_number, row, ["Row has more values than the header has columns"]
+                else:
+                    yield row_number, row, None
+        else:
+            for row_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield row_number, None, [f"Invalid JSON: {exc.msg}"]
+                    continue
+                if isinstance(row, dict):
+                    yield row_number, row, None
+                else:
+                    yield row_number, None, ["Each line must be a JSON object"]
+    except UnicodeDecodeError:
+        # Nothing after this point can be trusted; stop here and report where
+        yield row_number + 1, None, ["File is not valid UTF-8, import stopped here"]
+    finally:
+        # Don't let the wrapper close the upload's file when it's garbage collected
+        text.detach()
+
+
+def _row_name(raw: dict | None) -> str | None:
+    """The row's name for the error report, whatever the header's case or spacing."""
+    if not isinstance(raw, dict):
+        return None
+    for key, value in raw.items():
+        if isinstance(key, str) and key.strip().lower() == "name" and isinstance(value, str):
+            return value.strip() or None
+    return None
+
+
+def _normalize(raw: dict, categories: dict[str, int], category_ids: set[int]) -> dict:
+    """Tidy a raw row for FoodCreate: trimmed lowercase keys, blanks dropped, category resolved."""
+    data = {}
+    for key, value in raw.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if key and value not in ("", None):
+            data[key.strip().lower()] = value
+
+    if "category_id" not in data and "category" in data:
+        category_name = str(data.pop("category"))
+        if category_name.lower() not in categories:
+            raise ValueError(f"Unknown category '{category_name}'")
+        data["category_id"] = categories[category_name.lower()]
+    elif "category_id" in data and str(data["category_id"]).isdigit() and int(data["category_id"]) not in category_ids:
+        raise ValueError(f"Unknown category_id {data['category_id']}")
+    return data
+
+
+def _write_batch(db: Session, batch: dict[str, dict], report: FoodImportReport):
+    """Upsert one batch by name in a single transaction: one lookup, the UPDATEs and one INSERT executemany."""
+    existing = dict(
+        db.execute(select(Food.name, func.min(Food.id)).where(Food.name.in_(list(batch))).group_by(Food.name)).all()
+    )
+
+    updates = [{"id": existing[name], **food} for name, food in batch.items() if name in existing]
+    inserts = [{**_NEW_FOOD_DEFAULTS, **food} for name, food in batch.items() if name not in existing]
+
+    indexed = []
+    if updates:
+        # ORM bulk UPDATE by primary key. Rows only carry the columns they supplied, and
+        # consecutive rows with the same columns share one executemany, hence the sort
+        updates.sort(key=lambda row: sorted(row))
+        db.execute(update(Food), updates)
+        # Reindex with the stored description, which the row may not have included
+        indexed = [
+            dict(row._mapping)
+            for row in db.execute(select(Food.id, Food.name, Food.description).where(Food.id.in_([row["id"] for row in updates])))
+        ]
+    if inserts:
+        indexed += [
+            dict(row._mapping)
+            for row in db.execute(insert(Food).returning(Food.id, Food.name, Food.description), inserts)
+        ]
+
+    index_foods(db, indexed)
+    db.commit()
+
+    report.created += len(inserts)
+    report.updated += len(updates)
@@ -1,16 +1,164 @@
+import re
+import secrets
+import threading
+import time
+from sqlalchemy import select, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from app.config import settings
 from app.models.food import Food, Category
+from app.schemas.food import FoodOut, FoodSuggestion
+from app.utils.cache import TTLCache
+from app.utils.fast_json import ResponseEncoder
+from app.utils.prefix_index import PrefixIndex
 from typing import List, Optional
 
+# Read-through cache for menu reads.
+# Entries are FoodOut snapshots (not ORM objects) so they are safe to share across sessions.
+menu_cache = TTLCache(
+    ttl_seconds=settings.MENU_CACHE_TTL_SECONDS,
+    max_entries=settings.MENU_CACHE_MAX_ENTRIES,
+)
+
+# Search results get a cache of their own: every distinct query string is a new key, so
+# anonymous search traffic would otherwise evict the menu lists and the autocomplete index.
+search_cache = TTLCache(
+    ttl_seconds=settings.MENU_CACHE_TTL_SECONDS,
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+)
+
+# Version of the menu as served by this process, for ETag/Last-Modified on menu reads.
+# It is bumped with every cache invalidation, and also once the menu cache TTL has passed
+# so that changes made by another worker or process show up no later than in the cache.
+# The boot id keeps ETags from one process run from matching another's.
+_BOOT_ID = secrets.token_hex(4)
+_menu_version_lock = threading.Lock()
+_menu_version = {"number": 0, "changed_at": time.time()}
+
+def _bump_menu_version():
+    _menu_version["number"] += 1
+    _menu_version["changed_at"] = time.time()
+
+def menu_validators() -> tuple[str, float]:
+    """ETag and last change time (Unix timestamp) of the menu. No database access."""
+    with _menu_version_lock:
+        if time.time() - _menu_version["changed_at"] >= settings.MENU_CACHE_TTL_SECONDS:
+            _bump_menu_version()
+        number, changed_at = _menu_version["number"], _menu_version["changed_at"]
+    return f'"menu-{_BOOT_ID}-{number}"', changed_at
+
+def invalidate_menu_cache():
+    """Drop every cached menu read. Called after any write to foods or categories."""
+    menu_cache.clear()
+    search_cache.clear()
+    with _menu_version_lock:
+        _bump_menu_version()
+
+def _menu_statement(category_id: Optional[int], is_available: bool):
+    statement = select(Food).where(Food.is_available == is_available)
+
+    if category_id:
+        statement = statement.where(Food.category_id == category_id)
+
+    return statement
+
 # Fetch all food items with optional category filter
 def list_foods(db: Session, category_id: Optional[int] = None, is_available: bool = True) :
-    query = db.query(Food).filter(Food.is_available == is_available)
+    cache_key = ("list", category_id, is_available)
+    cached = menu_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-    if category_id:
-        query = query.filter(Food.category_id == category_id)
+    foods = [FoodOut.model_validate(food) for food in db.scalars(_menu_statement(category_id, is_available))]
+    menu_cache.set(cache_key, foods)
+    return foods
+
+async def list_foods_async(db: AsyncSession, category_id: Optional[int] = None, is_available: bool = True):
+    """Async version of list_foods. Shares the same menu cache."""
+    cache_key = ("list", category_id, is_available)
+    cached = menu_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = await db.scalars(_menu_statement(category_id, is_available))
+    foods = [FoodOut.model_validate(food) for food in result]
+    menu_cache.set(cache_key, foods)
+    return foods
+
+# Ranked full-text search over the foods_fts index (see database.ensure_search_index).
+# Name matches weigh ten times more than description matches.
+_SEARCH_SQL = text(
+    "SELECT foods.* FROM foods_fts JOIN foods ON foods.id = foods_fts.rowid "
+    "WHERE foods_fts MATCH :query AND foods.is_available = 1 "
+    "ORDER BY bm25(foods_fts, 10.0, 1.0) LIMIT :limit"
+)
+
+def _fts_query(search: str) -> str:
+    # Quote every word so user input can't use FTS5 syntax, and let each one match as a
+    # prefix ("jol" finds "Jollof"). Words are ANDed together.
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", search.lower()))
+
+async def search_foods_async(db: AsyncSession, search: str, limit: int = 20):
+    """Available menu items matching `search`, best match first. Cached in search_cache."""
+    query = _fts_query(search)
+    if not query:
+        return []
+
+    cache_key = (query, limit)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = await db.scalars(select(Food).from_statement(_SEARCH_SQL), {"query": query, "limit": limit})
+    foods = [FoodOut.model_validate(food) for food in result]
+    search_cache.set(cache_key, foods)
+    return foods
+
+async def autocomplete_async(db: AsyncSession, prefix: str, limit: int = 10):
+    """Names of available menu items with a word starting with `prefix`.
+
+    Served from an in-memory PrefixIndex kept in the menu cache, so it is rebuilt
+    (one query) after any menu write or when MENU_CACHE_TTL_SECONDS runs out.
+    """
+    index = menu_cache.get(("autocomplete",))
+    if index is None:
+        result = await db.execute(select(Food.id, Food.name).where(Food.is_available == True))
+        index = PrefixIndex((name, FoodSuggestion(id=food_id, name=name)) for food_id, name in result)
+        menu_cache.set(("autocomplete",), index)
+
+    return index.lookup(prefix, limit)
+
+def index_food(db: Session, food: Food):
+    """Write a food's name and description to the search index, in the caller's transaction."""
+    index_foods(db, [{"id": food.id, "name": food.name, "description": food.description}])
+
+def index_foods(db: Session, foods: List[dict]):
+    """Bulk version of index_food for {"id", "name", "description"} dicts (two executemany statements)."""
+    if not foods:
+        return
+    db.execute(text("DELETE FROM foods_fts WHERE rowid = :id"), [{"id": food["id"]} for food in foods])
+    db.execute(
+        text("INSERT INTO foods_fts (rowid, name, description) VALUES (:id, :name, :description)"),
+        [{"id": food["id"], "name": food["name"], "description": food["description"] or ""} for food in foods]
+    )
+
+food_list_encoder = ResponseEncoder(List[FoodOut])
+
+async def list_foods_json_async(db: AsyncSession, category_id: Optional[int] = None) -> bytes:
+    """The available menu as ready-to-send JSON bytes (FAST_JSON). Encoded once per cache fill."""
+    cache_key = ("list_json", category_id)
+    cached = menu_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-    return query.all()
+    encoded = food_list_encoder.encode(await list_foods_async(db, category_id=category_id, is_available=True))
+    menu_cache.set(cache_key, encoded)
+    return encoded
+
+async def list_categories_async(db: AsyncSession):
+    return (await db.scalars(select(Category))).all()
 
 # Administrative Action
 def create_category(db: Session, name: str):
@@ -20,8 +168,19 @@ def create_category(db: Session, name: str):
         db.add(category)
         db.commit()
         db.refresh(category)
+        invalidate_menu_cache()
     return category
 
+def seed_categories(db: Session, names: List[str]) -> int:
+    """Idempotently insert categories in one statement. Returns how many were new."""
+    statement = insert(Category).values([{"name": name} for name in names])
+    result = db.execute(statement.on_conflict_do_nothing(index_elements=[Category.name]))
+    db.commit()
+
+    if result.rowcount:
+        invalidate_menu_cache()
+    return result.rowcount
+
 def get_food_by_id(db: Session, food_id: int):
     """This fetches a specific food item or raises a 404 error."""
     food = db.query(Food).filter(Food.id == food_id).first()
@@ -32,6 +191,20 @@ def get_food_by_id(db: Session, food_id: int):
         )
     return food
 
+def get_menu_item(db: Session, food_id: int):
+    """Cached read of a single menu item for the public API.
+
+    Writers should keep using get_food_by_id, which returns the live ORM object.
+    """
+    cache_key = ("food", food_id)
+    cached = menu_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    food = FoodOut.model_validate(get_food_by_id(db, food_id))
+    menu_cache.set(cache_key, food)
+    return food
+
 def create_food(db: Session, name: str, description: str, price: float, category_id: int):
     # Create a new menu item.
     new_food = Food(
@@ -42,8 +215,11 @@ def create_food(db: Session, name: str, description: str, price: float, category
         is_available=True,
     )
     db.add(new_food)
+    db.flush()
+    index_food(db, new_food)
     db.commit()
     db.refresh(new_food)
+    invalidate_menu_cache()
     return new_food
 
 def update_food_availability(db: Session, food_id: int, is_available: bool):
@@ -51,6 +227,7 @@ def update_food_availability(db: Session, food_id: int, is_available: bool):
     food.is_available = is_available
     db.commit()
     db.refresh(food)
+    invalidate_menu_cache()
     return food
 
 def update_food_details(db: Session, food_id: int, update_data: dict):
@@ -60,25 +237,39 @@ def update_food_details(db: Session, food_id: int, update_data: dict):
     for key, value in update_data.items():
         setattr(food, key, value)
 
-        db.commit()
-        db.refresh(food)
-        return food
-    
+    if "name" in update_data or "description" in update_data:
+        db.flush()
+        index_food(db, food)
+
+    db.commit()
+    db.refresh(food)
+    invalidate_menu_cache()
+    return food
+
 def validate_food_availability(db: Session, cart_items: List[dict]):
-    # This checks if all items in the cart are available before checkout
+    # This checks if all items in the cart are available before checkout.
+    # All requested foods are loaded in a single IN query instead of one query per cart line.
+    food_ids = {item["food_id"] for item in cart_items}
+    foods = db.query(Food).filter(Food.id.in_(food_ids)).all() if food_ids else []
+    foods_by_id = {food.id: food for food in foods}
+
+    # check that every item exists and is currently on the menu, and report all bad items at once
+    unavailable = sorted(
+        food_id for food_id in food_ids
+        if food_id not in foods_by_id or not foods_by_id[food_id].is_available
+    )
+    if unavailable:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Items {unavailable} are no longer available."
+        )
+
     total_amount = 0.0
     validated_items = []
 
     for item in cart_items:
-        food = db.query(Food).filter(Food.id == item["food_id"]).first()
-
-        # check if it exists and is currently on the menu
-        if not food or not food.is_available:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Item {item.get('food_id')} is no longer available."
-            )
-        
+        food = foods_by_id[item["food_id"]]
+
         # Historical price tracking is handled in Order model
         item_total = food.price * item["quantity"]
         total_amount += item_total
@@ -0,0 +1,57 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.food import Food
+from app.models.order import Order, OrderItem
+from app.utils.kitchen_queue import KitchenQueue
+
+# What the kitchen still has to cook: lines of confirmed (and, until claimed, preparing) orders.
+# Kept in memory, rebuilt from the database at startup and updated on every status change.
+kitchen_queue = KitchenQueue()
+
+KITCHEN_STATUSES = ("confirmed", "preparing")
+
+
+def load_kitchen_queue(db: Session) -> int:
+    """Rebuild the queue from the database. Returns how many orders it holds.
+
+    Which lines had been claimed is not stored, so after a restart every line of a
+    preparing order is queued again; the kitchen sees a dish twice rather than never.
+    """
+    rows = db.execute(
+        select(Order.id, Order.created_at, OrderItem.food_id, OrderItem.quantity)
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .where(Order.status.in_(KITCHEN_STATUSES))
+        .order_by(Order.created_at, Order.id)
+    ).all()
+
+    orders: dict[int, tuple] = {}
+    for order_id, created_at, food_id, quantity in rows:
+        orders.setdefault(order_id, (created_at, []))[1].append((food_id, quantity))
+
+    kitchen_queue.reset()
+    for order_id, (created_at, lines) in orders.items():
+        kitchen_queue.add_order(order_id, created_at, lines)
+    return len(orders)
+
+
+def track_order(order: Order):
+    """Keep the queue in step with a committed status change."""
+    if order.status == "confirmed":
+        kitchen_queue.add_order(order.id, order.created_at, [(item.food_id, item.quantity) for item in order.items])
+    elif order.status not in KITCHEN_STATUSES:
+        kitchen_queue.remove_order(order.id)
+
+
+def describe_batches(db: Session, batches: list[tuple[int, dict[int, int]]]) -> list[dict]:
+    """Shape (food_id, {order_id: quantity}) batches for the API, with the food names."""
+    names = dict(db.execute(select(Food.id, Food.name).where(Food.id.in_([food_id for food_id, _ in batches]))).all())
+    return [
+        {
+            "food_id": food_id,
+            "name": names.get(food_id),
+            "quantity": sum(lines.values()),
+            "orders": [{"order_id": order_id, "quantity": quantity} for order_id, quantity in sorted(lines.items())],
+        }
+        for food_id, lines in batches
+    ]
@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.utils.pubsub import EventHub
+
+# Live order updates for SSE/WebSocket clients. Every event goes to the order owner's
+# topic and to the admin-wide one (the kitchen screen).
+order_events = EventHub(max_queue=settings.EVENTS_QUEUE_SIZE)
+
+ADMIN_TOPIC = "orders:all"
+
+def user_topic(user_id: int) -> str:
+    return f"orders:user:{user_id}"
+
+def publish_order_event(event_type: str, order, previous_status: str | None = None):
+    """Announce a committed order change. `order` is an Order or an OrderOut snapshot."""
+    order_events.publish([user_topic(order.user_id), ADMIN_TOPIC], {
+        "type": event_type,
+        "order_id": order.id,
+        "user_id": order.user_id,
+        "status": order.status,
+        "previous_status": previous_status,
+        "total_amount": order.total_amount,
+        "at": datetime.now(timezone.utc).isoformat(),
+    })
@@ -1,7 +1,19 @@
-from sqlalchemy.orm import Session
+import csv
+import io
+import json
+from datetime import datetime
+from sqlalchemy import String, func, insert, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import  HTTPException, status
-from app.models.order import Order, OrderItem
+from app.database import SessionLocal
+from app.models.order import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from app.schemas.order import OrderOut
+from app.services import analytics_service, kitchen_service
+from app.services.order_events import publish_order_event
 from app.services.food_service import validate_food_availability
+from app.utils.pagination import encode_cursor, keyset_before, sqlite_timestamp
 
 def create_order(db: Session, user_id: int, cart_items: list[dict]):
     """Transform the carts items into an order and save it to the database."""
@@ -15,35 +27,275 @@ def create_order(db: Session, user_id: int, cart_items: list[dict]):
             detail="Your cart is empty or contains unavailable items."
         )
     
-    # Create the order
+    # Create the order. Flushing (not committing) assigns its id and created_at,
+    # so the order and its items are written in a single transaction.
     new_order = Order(
         user_id=user_id,
         total_amount=total_amount,
         status="pending" # Default status  when order is first placed
     )
     db.add(new_order)
+    db.flush()
+
+    # Bulk-insert every order item in one INSERT ... RETURNING statement, rows back in cart order
+    order_items = db.scalars(
+        insert(OrderItem).returning(OrderItem, sort_by_parameter_order=True),
+        [
+            {
+                "order_id": new_order.id,
+                "food_id": item["food"].id,
+                "quantity": item["quantity"],
+                "unit_price": item["food"].price, # Capture the price at the time of order
+                "category_id": item["food"].category_id # and the category the rollups count it under
+            }
+            for item in validate_items
+        ]
+    ).all()
+    set_committed_value(new_order, "items", order_items)
+
+    # Count the sale in the daily rollups as part of the same transaction
+    analytics_service.apply_sales(db, new_order.created_at.date(), [
+        (item["food"].id, item["food"].category_id, item["quantity"], item["food"].price)
+        for item in validate_items
+    ])
+
+    # Snapshot the response before committing, so nothing has to be re-read afterwards
+    order_out = OrderOut.model_validate(new_order)
     db.commit()
-    db.refresh(new_order)
-
-    # Create order items
-    for item in validate_items:
-        food = item["food"]
-        order_item = OrderItem(
-            order_id=new_order.id,
-            food_id=food.id,
-            quantity=item["quantity"],
-            unit_price=food.price # Capture the price at the time of order
+
+    # Only announced once committed, so listeners never see an order that then rolls back
+    publish_order_event("order.created", order_out)
+    return order_out
+
+def _user_orders_statement(user_id: int, limit: int, cursor: str | None, model=Order):
+    statement = (
+        select(model)
+        .options(selectinload(model.items))
+        .where(model.user_id == user_id)
+    )
+    if cursor:
+        statement = statement.where(keyset_before(model.created_at, model.id, cursor))
+
+    # Fetch one extra row to know whether another page exists
+    return statement.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+def _newest_archived_statement(user_id: int):
+    # A seek on ix_archived_orders_user_id_created_at_id
+    return select(func.max(ArchivedOrder.created_at)).where(ArchivedOrder.user_id == user_id)
+
+def _needs_archive(orders: list, limit: int, newest_archived: datetime | None) -> bool:
+    """Whether archived orders could belong on this page.
+
+    `newest_archived` is the user's newest archived created_at (None when nothing is archived).
+    The archive only has to be read once the hot table runs out, or the page already reaches
+    back to that order. This doesn't depend on the archive age setting, so archiving by hand
+    with a different age can't hide orders.
+    """
+    if newest_archived is None:
+        return False
+    return len(orders) <= limit or orders[-1].created_at <= newest_archived
+
+def _merge_archive(orders: list, archived: list, limit: int) -> list:
+    merged = sorted([*orders, *archived], key=lambda order: (order.created_at, order.id), reverse=True)
+    return merged[:limit + 1]
+
+def _paginate(orders: list, limit: int):
+    """Trim the extra look-ahead row and build the cursor for the next page."""
+    if len(orders) > limit:
+        orders = orders[:limit]
+        return orders, encode_cursor(orders[-1].created_at, orders[-1].id)
+    return orders, None
+
+def get_user_orders(db: Session, user_id: int, limit: int = 20, cursor: str | None = None):
+    """Fetches one page of a user's orders, newest first.
+
+    Pages are keyset-paginated on (created_at, id), so every page costs the same no matter
+    how long the history is. Items for the whole page are loaded with one extra query.
+    Pages reaching back to the user's newest archived order also read the archive tables.
+    Returns (orders, next_cursor); next_cursor is None on the last page.
+    """
+    orders = db.scalars(_user_orders_statement(user_id, limit, cursor)).all()
+    if _needs_archive(orders, limit, db.scalar(_newest_archived_statement(user_id))):
+        archived = db.scalars(_user_orders_statement(user_id, limit, cursor, model=ArchivedOrder)).all()
+        orders = _merge_archive(orders, archived, limit)
+    return _paginate(orders, limit)
+
+async def get_user_orders_async(db: AsyncSession, user_id: int, limit: int = 20, cursor: str | None = None):
+    """Async version of get_user_orders for the async database path."""
+    orders = (await db.scalars(_user_orders_statement(user_id, limit, cursor))).all()
+    if _needs_archive(orders, limit, await db.scalar(_newest_archived_statement(user_id))):
+        archived = (await db.scalars(_user_orders_statement(user_id, limit, cursor, model=ArchivedOrder))).all()
+        orders = _merge_archive(orders, archived, limit)
+    return _paginate(orders, limit)
+
+async def get_order_async(db: AsyncSession, order_id: int):
+    """Fetch a single order with its items (archived or not), or raise a 404."""
+    order = (
+        await db.scalars(select(Order).options(selectinload(Order.items)).where(Order.id == order_id))
+    ).first()
+
+    if not order:
+        order = (
+            await db.scalars(select(ArchivedOrder).options(selectinload(ArchivedOrder.items)).where(ArchivedOrder.id == order_id))
+        ).first()
+
+    if not order:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    return order
+
+def _order_filters(
+        status_filter: str | None,
+        user_id: int | None,
+        created_from: datetime | None,
+        created_to: datetime | None,
+        model=Order
+) -> list:
+    """WHERE clauses shared by the admin listing and the export, for Order or ArchivedOrder."""
+    if status_filter and status_filter not in ORDER_TRANSITIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown order status '{status_filter}'. Valid statuses are: {list(ORDER_TRANSITIONS)}"
         )
-        db.add(order_item)
 
-    db.commit()
-    db.refresh(new_order)
+    filters = []
+    if status_filter:
+        filters.append(model.status == status_filter)
+    if user_id:
+        filters.append(model.user_id == user_id)
+    if created_from:
+        filters.append(model.created_at >= literal(sqlite_timestamp(created_from), String))
+    if created_to:
+        filters.append(model.created_at < literal(sqlite_timestamp(created_to), String))
+    return filters
+
+def _admin_orders_statement(filters: list, limit: int, cursor: str | None, model=Order):
+    statement = select(model).options(selectinload(model.items)).where(*filters)
+    if cursor:
+        statement = statement.where(keyset_before(model.created_at, model.id, cursor))
+    return statement.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+def list_orders(
+        db: Session,
+        status_filter: str | None = None,
+        user_id: int | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+        include_archived: bool = False
+):
+    """Admin view over all orders, newest first, keyset-paginated on (created_at, id).
+
+    Each filter combination is served by one of the composite indexes on Order,
+    so e.g. "pending orders since 11:00" stays an index range scan.
+    Archived orders are left out unless `include_archived`; the archive is only indexed
+    by user, so other filters scan it.
+    Returns (orders, next_cursor) like get_user_orders.
+    """
+    filters = _order_filters(status_filter, user_id, created_from, created_to)
+    orders = db.scalars(_admin_orders_statement(filters, limit, cursor)).all()
+    if include_archived:
+        filters = _order_filters(status_filter, user_id, created_from, created_to, model=ArchivedOrder)
+        archived = db.scalars(_admin_orders_statement(filters, limit, cursor, model=ArchivedOrder)).all()
+        orders = _merge_archive(orders, archived, limit)
+    return _paginate(orders, limit)
+
+# Columns of the CSV export, one row per order item (order fields repeat on each of its rows)
+EXPORT_CSV_COLUMNS = [
+    "order_id", "user_id", "status", "total_amount", "created_at",
+    "item_id", "food_id", "quantity", "unit_price",
+]
+
+def export_orders(
+        status_filter: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        export_format: str = "ndjson",
+        batch_size: int = 1000,
+        session_factory=SessionLocal,
+        include_archived: bool = False
+):
+    """Stream orders with their items, oldest first, as NDJSON (one order per line) or CSV.
+
+    Returns a generator of text chunks for a StreamingResponse. Filters are checked right away;
+    the query only runs once the response starts being sent. Rows come off a server-side
+    cursor `batch_size` at a time, so memory stays flat however many orders match.
+    With `include_archived`, archived orders are merged in (UNION ALL) in the same order.
+    The generator has its own session, since it outlives the request's get_db session.
+    """
+    statement = _export_rows(Order, OrderItem, _order_filters(status_filter, None, created_from, created_to))
+    if include_archived:
+        statement = union_all(statement, _export_rows(
+            ArchivedOrder, ArchivedOrderItem,
+            _order_filters(status_filter, None, created_from, created_to, model=ArchivedOrder)
+        ))
+    # Keeps each order's rows together so NDJSON can group them without buffering
+    statement = (
+        statement.order_by("created_at", "order_id", "item_id")
+        .execution_options(yield_per=batch_size, stream_results=True)
+    )
+
+    def generate():
+        with session_factory() as db:
+            batches = db.execute(statement).partitions()
+            if export_format == "csv":
+                yield _csv_chunk([EXPORT_CSV_COLUMNS])
+                for rows in batches:
+                    yield _csv_chunk(_csv_row(row) for row in rows)
+            else:
+                yield from _ndjson_orders(batches)
+
+    return generate()
+
+def _export_rows(order_model, item_model, filters: list):
+    return (
+        select(
+            order_model.id.label("order_id"), order_model.user_id, order_model.status, order_model.total_amount,
+            order_model.created_at, item_model.id.label("item_id"), item_model.food_id, item_model.quantity,
+            item_model.unit_price
+        )
+        .outerjoin(item_model, item_model.order_id == order_model.id)
+        .where(*filters)
+    )
+
+def _ndjson_orders(batches):
+    """Fold each order's item rows into one JSON line, a batch of rows at a time."""
+    pending = None  # the order whose items may continue into the next batch
+    for rows in batches:
+        finished = []
+        for row in rows:
+            if pending is None or pending["id"] != row[0]:
+                if pending is not None:
+                    finished.append(pending)
+                pending = _export_order(row)
+            if row[5] is not None:
+                pending["items"].append({"id": row[5], "food_id": row[6], "quantity": row[7], "unit_price": row[8]})
+        if finished:
+            yield _ndjson_chunk(finished)
+    if pending is not None:
+        yield _ndjson_chunk([pending])
+
+def _export_order(row) -> dict:
+    return {
+        "id": row[0],
+        "user_id": row[1],
+        "status": row[2],
+        "total_amount": row[3],
+        "created_at": row[4].isoformat() if row[4] else None,
+        "items": [],
+    }
 
-    return new_order
+def _csv_row(row) -> list:
+    created_at = row[4].isoformat() if row[4] else ""
+    return [row[0], row[1], row[2], row[3], created_at, row[5], row[6], row[7], row[8]]
 
-def get_user_orders(db: Session, user_id: int):
-    """Fetches all orders placed by a specific user."""
-    return db.query(Order).filter(Order.user_id == user_id).order_by(Order.created_at.desc()).all()
+def _ndjson_chunk(orders: list[dict]) -> str:
+    return "".join(json.dumps(order) + "\n" for order in orders)
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
 
 # Order status transition
 ORDER_TRANSITIONS = {
@@ -61,6 +313,19 @@ def can_cancel_order(order_status: str) -> bool:
     return order_status in cancellable_statuses
 
 
+def _set_status(db: Session, order: Order, new_status: str):
+    """Change an order's status inside the caller's transaction."""
+    order.status = new_status
+
+    # A cancelled order no longer counts as a sale
+    if new_status == "cancelled":
+        analytics_service.reverse_order_sales(db, order)
+
+def _status_committed(order, previous_status: str):
+    """Tell the kitchen queue and event listeners about a committed change. `order` may be an OrderOut snapshot."""
+    kitchen_service.track_order(order)
+    publish_order_event("order.status", order, previous_status=previous_status)
+
 # Update Order
 def update_order_status(db: Session, order_id: int, new_status: str):
     """Updates the status of an existing order. (e.g., pending, preparing, delivered)"""
@@ -83,13 +348,67 @@ def update_order_status(db: Session, order_id: int, new_status: str):
         )
     
     # Update status
-    order.status = new_status
+    _set_status(db, order, new_status)
 
     db.commit()
     db.refresh(order)
 
+    _status_committed(order, current_status)
     return order
 
+def bulk_update_order_status(db: Session, order_ids: list[int], new_status: str) -> list[dict]:
+    """Move many orders to `new_status` in one transaction, e.g. a lunch rush to out_for_delivery.
+
+    All orders are loaded with one query and each is checked against ORDER_TRANSITIONS.
+    Valid ones are updated and committed together; the rest are left alone. Returns one
+    result per requested id, in request order.
+    """
+    if new_status not in ORDER_TRANSITIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown order status '{new_status}'. Valid statuses are: {list(ORDER_TRANSITIONS)}"
+        )
+
+    order_ids = list(dict.fromkeys(order_ids))
+    orders = {
+        order.id: order
+        for order in db.scalars(select(Order).options(selectinload(Order.items)).where(Order.id.in_(order_ids)))
+    }
+
+    results = []
+    changed = []
+    for order_id in order_ids:
+        order = orders.get(order_id)
+        if order is None:
+            results.append({"order_id": order_id, "updated": False, "detail": "Order not found"})
+            continue
+
+        current_status = order.status
+        if new_status not in ORDER_TRANSITIONS.get(current_status, []):
+            results.append({
+                "order_id": order_id,
+                "updated": False,
+                "previous_status": current_status,
+                "status": current_status,
+                "detail": f"Cannot update order status from '{current_status}' to '{new_status}'"
+            })
+            continue
+
+        _set_status(db, order, new_status)
+        results.append({"order_id": order_id, "updated": True, "previous_status": current_status, "status": new_status})
+        changed.append((order, current_status))
+
+    if not changed:
+        return results
+
+    # Snapshot before committing, so nothing has to be re-read afterwards
+    snapshots = [(OrderOut.model_validate(order), previous_status) for order, previous_status in changed]
+    db.commit()
+
+    for snapshot, previous_status in snapshots:
+        _status_committed(snapshot, previous_status)
+    return results
+
 # Cancel Order completelly
 def cancel_order(db: Session, order_id: int, user_id: int):
     """Cancel an order - user only can cancel own order"""
@@ -116,10 +435,56 @@ def cancel_order(db: Session, order_id: int, user_id: int):
             detail=f"Cannot cancel order with status '{order.status}.' Only 'pending' or 'confirmed' order can be cancelled"
         )
     
-    # Mark order as cancelled
-    order.status = "cancelled"
+    # Mark order as cancelled, and take it back out of the sales rollups
+    previous_status = order.status
+    _set_status(db, order, "cancelled")
 
     db.commit()
     db.refresh(order)
 
-    return order
\ No newline at end of file
+    _status_committed(order, previous_status)
+    return order
+
+# Kitchen
+def claim_kitchen_batch(db: Session) -> dict | None:
+    """Hand the kitchen its next batch and mark the confirmed orders in it as preparing.
+
+    Returns None when nothing is waiting.
+    """
+    while True:
+        claimed = kitchen_service.kitchen_queue.claim()
+        if claimed is None:
+            return None
+        food_id, lines = claimed
+
+        # Confirmed orders start preparing; ones already preparing just stay that way
+        try:
+            results = bulk_update_order_status(db, list(lines), "preparing")
+        except Exception:
+            # Nothing was committed, so the batch is still waiting to be cooked
+            kitchen_service.kitchen_queue.restore(food_id, lines)
+            raise
+        for result in results:
+            if not result["updated"] and result.get("status") != "preparing":
+                # Cancelled (or sent out) since it was queued
+                del lines[result["order_id"]]
+
+        if lines:
+            return kitchen_service.describe_batches(db, [(food_id, lines)])[0]
+
+def advance_order(db: Session, order_id: int):
+    """Move an order one step along the normal flow (confirmed -> preparing -> out_for_delivery -> completed)."""
+    current_status = db.scalar(select(Order.status).where(Order.id == order_id))
+    if current_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Order with ID {order_id} not found."
+        )
+
+    next_statuses = [s for s in ORDER_TRANSITIONS.get(current_status, []) if s != "cancelled"]
+    if not next_statuses:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Order with status '{current_status}' has no next step"
+        )
+    return update_order_status(db, order_id, next_statuses[0])
\ No newline at end of file
@@ -0,0 +1,180 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.otp import OTPCode
+from app.utils.cache import TTLCache
+from app.utils.clock import utcnow
+from app.utils.otp import generate_otp, verify_otp
+
+
+class OTPThrottled(Exception):
+    """Raised when a code may not be sent or checked right now."""
+
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class OTPStore(ABC):
+    """Where pending verification codes live, keyed by email.
+
+    Each email has at most one live code. A new code can only be issued once the resend
+    cooldown has passed, and a code stops being accepted after `max_attempts` wrong guesses
+    (the user has to ask for a new one).
+    """
+
+    def __init__(self, ttl_seconds: int, resend_cooldown_seconds: int, max_attempts: int):
+        self.ttl_seconds = ttl_seconds
+        self.resend_cooldown_seconds = resend_cooldown_seconds
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def issue(self, email: str) -> str:
+        """Create and store a new code for `email` and return it. Raises OTPThrottled during the cooldown."""
+
+    @abstractmethod
+    def verify(self, email: str, code: str) -> bool:
+        """Check a code. A correct one is consumed; a wrong one counts as an attempt."""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Delete expired codes and return how many were removed."""
+
+    def _retry_after(self, sent_at: datetime) -> int:
+        remaining = (sent_at + timedelta(seconds=self.resend_cooldown_seconds) - utcnow()).total_seconds()
+        return max(1, math.ceil(remaining))
+
+    def _too_many_attempts(self, sent_at: datetime) -> OTPThrottled:
+        return OTPThrottled("Too many incorrect codes, please request a new one", self._retry_after(sent_at))
+
+
+@dataclass
+class _PendingCode:
+    code: str
+    expires_at: datetime
+    sent_at: datetime
+    attempts: int = 0
+
+
+class MemoryOTPStore(OTPStore):
+    """Per-process store. Codes are lost on restart and not shared between workers."""
+
+    def __init__(self, ttl_seconds: int, resend_cooldown_seconds: int, max_attempts: int, max_entries: int):
+        super().__init__(ttl_seconds, resend_cooldown_seconds, max_attempts)
+        # Entries must outlive the cooldown too, or waiting for expiry would bypass it
+        self._codes = TTLCache(ttl_seconds=max(ttl_seconds, resend_cooldown_seconds), max_entries=max_entries)
+        # Checks and updates of one entry have to happen together
+        self._lock = threading.Lock()
+
+    def issue(self, email: str) -> str:
+        now = utcnow()
+        with self._lock:
+            pending = self._codes.get(email)
+            if pending and now < pending.sent_at + timedelta(seconds=self.resend_cooldown_seconds):
+                raise OTPThrottled("Please wait before requesting another code", self._retry_after(pending.sent_at))
+
+            code = generate_otp()
+            self._codes.set(email, _PendingCode(code, now + timedelta(seconds=self.ttl_seconds), now))
+            return code
+
+    def verify(self, email: str, code: str) -> bool:
+        with self._lock:
+            pending = self._codes.get(email)
+            if not pending:
+                return False
+            if pending.attempts >= self.max_attempts:
+                raise self._too_many_attempts(pending.sent_at)
+
+            if verify_otp(pending.code, code, pending.expires_at):
+                self._codes.delete(email)
+                return True
+
+            pending.attempts += 1
+            return False
+
+    def purge_expired(self) -> int:
+        return self._codes.purge_expired()
+
+
+class SQLiteOTPStore(OTPStore):
+    """Stores codes in the otp_codes table, so they survive restarts and are shared by workers."""
+
+    def __init__(self, ttl_seconds: int, resend_cooldown_seconds: int, max_attempts: int, session_factory=SessionLocal):
+        super().__init__(ttl_seconds, resend_cooldown_seconds, max_attempts)
+        self._session_factory = session_factory
+
+    def issue(self, email: str) -> str:
+        now = utcnow()
+        code = generate_otp()
+        statement = insert(OTPCode).values(
+            email=email, code=code, expires_at=now + timedelta(seconds=self.ttl_seconds), attempts=0, sent_at=now
+        )
+        # Only replace an existing code once its cooldown is over; the check and the write
+        # are one statement, so concurrent resends can't both get through
+        statement = statement.on_conflict_do_update(
+            index_elements=[OTPCode.email],
+            set_={
+                "code": statement.excluded["code"],
+                "expires_at": statement.excluded["expires_at"],
+                "attempts": 0,
+                "sent_at": statement.excluded["sent_at"],
+            },
+            where=OTPCode.sent_at <= now - timedelta(seconds=self.resend_cooldown_seconds)
+        )
+        with self._session_factory() as db:
+            result = db.execute(statement)
+            if result.rowcount == 0:
+                sent_at = db.scalar(select(OTPCode.sent_at).where(OTPCode.email == email))
+                raise OTPThrottled("Please wait before requesting another code", self._retry_after(sent_at or now))
+            db.commit()
+        return code
+
+    def verify(self, email: str, code: str) -> bool:
+        with self._session_factory() as db:
+            pending = db.get(OTPCode, email)
+            if not pending:
+                return False
+            if pending.attempts >= self.max_attempts:
+                raise self._too_many_attempts(pending.sent_at)
+
+            if verify_otp(pending.code, code, pending.expires_at):
+                db.delete(pending)
+                db.commit()
+                return True
+
+            db.execute(update(OTPCode).where(OTPCode.email == email).values(attempts=OTPCode.attempts + 1))
+            db.commit()
+            return False
+
+    def purge_expired(self) -> int:
+        # Keep rows still inside their resend cooldown, like the memory store does
+        cutoff = utcnow() - timedelta(seconds=self.resend_cooldown_seconds)
+        with self._session_factory() as db:
+            result = db.execute(delete(OTPCode).where(OTPCode.expires_at <= utcnow(), OTPCode.sent_at <= cutoff))
+            db.commit()
+            return result.rowcount
+
+
+def _build_otp_store() -> OTPStore:
+    options = dict(
+        ttl_seconds=settings.OTP_TTL_SECONDS,
+        resend_cooldown_seconds=settings.OTP_RESEND_COOLDOWN_SECONDS,
+        max_attempts=settings.OTP_MAX_ATTEMPTS
+    )
+    if settings.OTP_BACKEND == "sqlite":
+        return SQLiteOTPStore(**options)
+    if settings.OTP_BACKEND == "memory":
+        return MemoryOTPStore(**options, max_entries=settings.OTP_MAX_ENTRIES)
+    raise ValueError(f"Unknown OTP_BACKEND '{settings.OTP_BACKEND}', expected 'memory' or 'sqlite'")
+
+
+otp_store = _build_otp_store()
@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    """The current time as naive UTC, matching how SQLite hands DateTime values back."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
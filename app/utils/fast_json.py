@@ -0,0 +1,45 @@
+"""Faster JSON responses, used when FAST_JSON is on.
+
+FastAPI's default path for a response_model validates every object through the schema,
+dumps it to Python, runs jsonable_encoder over the result and finally json.dumps it.
+For long lists that is most of the request's CPU. Here instead:
+
+* ResponseEncoder holds a TypeAdapter built once per response type and goes from ORM
+  objects (or snapshots) to JSON bytes in a single pass inside pydantic-core.
+* FastJSONResponse sends those bytes as they are, and encodes any other content with
+  orjson when it is installed (falling back to the stdlib encoder when it isn't).
+
+See benchmarks/bench_serialization.py for the numbers.
+"""
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that passes pre-encoded bytes through and uses orjson for everything else."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if orjson is not None:
+            return orjson.dumps(content)
+        return super().render(content)
+
+
+class ResponseEncoder:
+    """Validate and encode one response type (e.g. List[FoodOut]) straight to JSON bytes."""
+
+    def __init__(self, schema: Any):
+        self.adapter = TypeAdapter(schema)
+
+    def encode(self, data: Any) -> bytes:
+        # from_attributes lets ORM objects (and nested relationships) through without a
+        # per-object model_validate call first
+        return self.adapter.dump_json(self.adapter.validate_python(data, from_attributes=True))
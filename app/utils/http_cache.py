@@ -0,0 +1,32 @@
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Request
+
+
+def http_date(timestamp: float) -> str:
+    """Format a Unix timestamp for Last-Modified ("Wed, 21 Oct 2015 07:28:00 GMT")."""
+    return formatdate(timestamp, usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag, as RFC 9110 asks for GETs."""
+    if if_none_match.strip() == "*":
+        return True
+    ours = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == ours for candidate in if_none_match.split(","))
+
+
+def is_not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """True when the client's cached copy (per If-None-Match, else If-Modified-Since) is current."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins when both are sent
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
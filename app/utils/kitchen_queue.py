@@ -0,0 +1,111 @@
+import heapq
+import threading
+from typing import Any, Iterable
+
+
+class KitchenQueue:
+    """Order lines waiting to be cooked, handed out one food at a time.
+
+    claim() finds the oldest waiting line and returns it together with every other waiting
+    line for the same food, across all orders ("12 jollof rice for orders 4, 7 and 9"), so
+    the oldest order is never starved but identical dishes are cooked together.
+
+    Each (order, food) pair is pushed on a heap once, keyed by the order's age. Lines that were
+    claimed with an earlier batch, or dropped with their order, are not searched for and
+    removed; they are skipped when they reach the top. Push and pop are O(log n).
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[Any, int, int]] = []  # (placed_at, order_id, food_id)
+        self._waiting: dict[int, dict[int, int]] = {}  # food_id -> {order_id: quantity}
+        self._orders: dict[int, set[int]] = {}  # order_id -> food_ids still waiting
+        self._placed_at: dict[int, Any] = {}  # order_id -> placed_at, until remove_order
+        self._lock = threading.Lock()
+
+    def add_order(self, order_id: int, placed_at: Any, lines: Iterable[tuple[int, int]]):
+        """Queue an order's (food_id, quantity) lines. Adding an order twice does nothing."""
+        with self._lock:
+            if order_id in self._placed_at:
+                return
+            foods = set()
+            for food_id, quantity in lines:
+                waiting = self._waiting.setdefault(food_id, {})
+                waiting[order_id] = waiting.get(order_id, 0) + quantity
+                if food_id not in foods:
+                    heapq.heappush(self._heap, (placed_at, order_id, food_id))
+                    foods.add(food_id)
+            if foods:
+                self._orders[order_id] = foods
+                self._placed_at[order_id] = placed_at
+
+    def remove_order(self, order_id: int):
+        """Drop whatever is still waiting for an order (cancelled, or sent out)."""
+        with self._lock:
+            self._placed_at.pop(order_id, None)
+            for food_id in self._orders.pop(order_id, ()):
+                waiting = self._waiting[food_id]
+                del waiting[order_id]
+                if not waiting:
+                    del self._waiting[food_id]
+
+    def claim(self) -> tuple[int, dict[int, int]] | None:
+        """Take the next batch: (food_id, {order_id: quantity}), oldest order first. None when empty."""
+        with self._lock:
+            while self._heap:
+                _, order_id, food_id = heapq.heappop(self._heap)
+                waiting = self._waiting.get(food_id)
+                if waiting is None or order_id not in waiting:
+                    continue  # already claimed or dropped
+                del self._waiting[food_id]
+                for claimed_order_id in waiting:
+                    foods = self._orders[claimed_order_id]
+                    foods.discard(food_id)
+                    if not foods:
+                        del self._orders[claimed_order_id]
+                return food_id, waiting
+            return None
+
+    def restore(self, food_id: int, lines: dict[int, int]):
+        """Put back a batch from claim() that could not be handed out, in its orders' places.
+
+        Orders removed since the claim stay removed.
+        """
+        with self._lock:
+            for order_id, quantity in lines.items():
+                placed_at = self._placed_at.get(order_id)
+                if placed_at is None:
+                    continue
+                waiting = self._waiting.setdefault(food_id, {})
+                waiting[order_id] = waiting.get(order_id, 0) + quantity
+                self._orders.setdefault(order_id, set()).add(food_id)
+                heapq.heappush(self._heap, (placed_at, order_id, food_id))
+
+    def peek(self, limit: int) -> list[tuple[int, dict[int, int]]]:
+        """The next `limit` batches claim() would hand out, without taking them."""
+        with self._lock:
+            batches = []
+            seen = set()
+            for _, order_id, food_id in sorted(self._heap):
+                if len(batches) >= limit:
+                    break
+                waiting = self._waiting.get(food_id)
+                if food_id in seen or waiting is None or order_id not in waiting:
+                    continue
+                seen.add(food_id)
+                batches.append((food_id, dict(waiting)))
+            return batches
+
+    def reset(self):
+        with self._lock:
+            self._heap.clear()
+            self._waiting.clear()
+            self._orders.clear()
+            self._placed_at.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "orders": len(self._orders),
+                "foods": len(self._waiting),
+                "quantity": sum(sum(waiting.values()) for waiting in self._waiting.values()),
+            }
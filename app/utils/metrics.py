@@ -0,0 +1,185 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Keep slow-request logs readable
+MAX_RECORDED_STATEMENTS = 50
+
+
+class RequestStats:
+    """SQL work done while handling one request."""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.statements = []
+
+    def record(self, statement: str, seconds: float):
+        self.sql_count += 1
+        self.sql_seconds += seconds
+        if len(self.statements) < MAX_RECORDED_STATEMENTS:
+            self.statements.append((statement, seconds))
+
+
+# The stats object of the request being handled. The middleware sets it, and because
+# the threadpool copies the context, sync handlers see (and add to) the same object.
+_current_request: ContextVar[RequestStats | None] = ContextVar("current_request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = _current_request.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def install_sql_hooks(engine):
+    """Count and time every statement executed on `engine` against the current request."""
+    # Safe to call more than once (e.g. one create_app() per test)
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def format_metric(name: str, value, help_text: str, metric_type: str = "gauge") -> list[str]:
+    """Lines for a single unlabelled metric, for use by registry collectors."""
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}", f"{name} {value}"]
+
+
+class MetricsRegistry:
+    """Per-route request metrics, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency = {}       # (method, route) -> [bucket counts..., sum, count]
+        self._responses = {}     # (method, route, status) -> count
+        self._sql_statements = {}  # (method, route) -> total statements
+        self._sql_seconds = {}   # (method, route) -> total seconds
+        self._collectors = []
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            histogram = self._latency.setdefault(key, [0] * len(LATENCY_BUCKETS) + [0.0, 0])
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram[i] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+            status_key = (method, route, str(status_code))
+            self._responses[status_key] = self._responses.get(status_key, 0) + 1
+            self._sql_statements[key] = self._sql_statements.get(key, 0) + stats.sql_count
+            self._sql_seconds[key] = self._sql_seconds.get(key, 0.0) + stats.sql_seconds
+
+    def register_collector(self, collector):
+        """Add a callable returning extra metric lines (already in Prometheus text format)."""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            lines.append("# HELP http_request_duration_seconds Request latency by route")
+            lines.append("# TYPE http_request_duration_seconds histogram")
+            for (method, route), histogram in sorted(self._latency.items()):
+                labels = f'method="{method}",route="{route}"'
+                for bound, count in zip(LATENCY_BUCKETS, histogram):
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram[-1]}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {histogram[-2]:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {histogram[-1]}")
+
+            lines.append("# HELP http_responses_total Responses by route and status code")
+            lines.append("# TYPE http_responses_total counter")
+            for (method, route, status_code), count in sorted(self._responses.items()):
+                lines.append(f'http_responses_total{{method="{method}",route="{route}",status="{status_code}"}} {count}')
+
+            lines.append("# HELP db_statements_total SQL statements executed while handling requests")
+            lines.append("# TYPE db_statements_total counter")
+            for (method, route), count in sorted(self._sql_statements.items()):
+                lines.append(f'db_statements_total{{method="{method}",route="{route}"}} {count}')
+
+            lines.append("# HELP db_statement_seconds_total Time spent in SQL statements while handling requests")
+            lines.append("# TYPE db_statement_seconds_total counter")
+            for (method, route), seconds in sorted(self._sql_seconds.items()):
+                lines.append(f'db_statement_seconds_total{{method="{method}",route="{route}"}} {seconds:.6f}')
+
+            collectors = list(self._collectors)
+
+        for collector in collectors:
+            lines.extend(collector())
+
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Records latency, status code and SQL work per route, and logs slow requests.
+
+    A request is observed once its body has been sent, so a StreamingResponse (the order
+    export) is timed to its last chunk and counts the statements its generator runs.
+    """
+
+    def __init__(self, app, slow_request_ms: float):
+        super().__init__(app)
+        self.slow_request_ms = slow_request_ms
+
+    async def dispatch(self, request: Request, call_next):
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        except BaseException:
+            self._observe(request, 500, start, stats)
+            raise
+        finally:
+            # The endpoint and its body iterator run in a task that copied the context,
+            # so they keep adding to `stats` after this reset
+            _current_request.reset(token)
+
+        response.body_iterator = self._observe_after(response.body_iterator, request, response.status_code, start, stats)
+        return response
+
+    async def _observe_after(self, body_iterator, request: Request, status_code: int, start: float, stats: RequestStats):
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            self._observe(request, status_code, start, stats)
+
+    def _observe(self, request: Request, status_code: int, start: float, stats: RequestStats):
+        elapsed = time.perf_counter() - start
+
+        # Use the route template (/orders/{order_id}) so label values stay bounded
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        metrics_registry.observe(request.method, route_path, status_code, elapsed, stats)
+
+        if elapsed * 1000 >= self.slow_request_ms:
+            statements = "\n".join(
+                f"  [{seconds * 1000:.1f} ms] {statement}" for statement, seconds in stats.statements
+            )
+            logger.warning(
+                "Slow request %s %s -> %s took %.1f ms (%d SQL statements, %.1f ms in SQL)\n%s",
+                request.method, request.url.path, status_code, elapsed * 1000,
+                stats.sql_count, stats.sql_seconds * 1000, statements
+            )
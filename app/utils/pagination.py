@@ -0,0 +1,51 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import String, and_, literal, or_
+
+
+def sqlite_timestamp(value: datetime) -> str:
+    """Format a datetime the way SQLite's CURRENT_TIMESTAMP stores it.
+
+    created_at columns are filled by the database (server_default=func.now()), so they
+    are stored as 'YYYY-MM-DD HH:MM:SS' text in UTC. Comparing them against SQLAlchemy's
+    own datetime binds (which always carry microseconds) would give wrong results.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    if value.microsecond:
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([sqlite_timestamp(created_at), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(created_at), int(row_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_before(created_at_column, id_column, cursor: str):
+    """Filter for rows that come after `cursor` when ordering by (created_at DESC, id DESC).
+
+    Written as 'created_at <= ts AND (created_at < ts OR id < last_id)' so SQLite can
+    still use a (…, created_at, id) index for a range scan.
+    """
+    created_at, row_id = decode_cursor(cursor)
+    ts = literal(created_at, String)
+    return and_(
+        created_at_column <= ts,
+        or_(created_at_column < ts, id_column < row_id),
+    )
@@ -0,0 +1,48 @@
+import re
+from bisect import bisect_left
+from typing import Any, Iterable
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace/punctuation, so "Jollof  Rice!" and "jollof rice" match."""
+    return " ".join(_WORD.findall(text.lower()))
+
+
+class PrefixIndex:
+    """Sorted, immutable index answering "which names start with this prefix" by binary search.
+
+    Every word of a name is a starting point, so "ric" finds "Jollof Rice" as well as "Rice Balls".
+    Lookups are O(log n + matches) and need no locking; rebuild a new index when the names change.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, Any]]):
+        keys = []
+        for name, value in entries:
+            words = normalize(name).split()
+            for i in range(len(words)):
+                keys.append((" ".join(words[i:]), i, value))
+        # Whole-name matches (i == 0) sort ahead of mid-name matches of the same text
+        keys.sort(key=lambda key: (key[0], key[1]))
+        self._keys = [key for key, _, _ in keys]
+        self._values = [value for _, _, value in keys]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, prefix: str, limit: int) -> list:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        results, seen = [], set()
+        position = bisect_left(self._keys, prefix)
+        while position < len(self._keys) and self._keys[position].startswith(prefix) and len(results) < limit:
+            value = self._values[position]
+            # A name can match on more than one of its words; list it once
+            if id(value) not in seen:
+                seen.add(id(value))
+                results.append(value)
+            position += 1
+        return results
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+# Put in a subscriber's queue when it is dropped for falling behind
+EVICTED = object()
+
+
+class Subscription:
+    """One consumer's queue of events. Read with `await subscription.get()`."""
+
+    def __init__(self, topics: tuple[str, ...], max_queue: int):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    async def get(self, timeout: float):
+        """Next event, EVICTED, or None when nothing arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    """In-process publish/subscribe for pushing events to SSE/WebSocket clients.
+
+    Subscribers live on the server's event loop; publish() may be called from any thread
+    (sync endpoints run in the threadpool) and hands delivery over to the loop.
+    Each subscriber has a bounded queue. One that falls `max_queue` events behind is
+    evicted rather than buffered without limit: its queue is replaced by EVICTED, and
+    the client is expected to reconnect and catch up with a normal read.
+    """
+
+    def __init__(self, max_queue: int):
+        self.max_queue = max_queue
+        self.published = 0
+        self.delivered = 0
+        self.evicted = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach to the server's loop. Called once at startup, before anyone subscribes."""
+        self._loop = loop
+
+    def subscribe(self, *topics: str) -> Subscription:
+        """Must be called on the bound event loop."""
+        subscription = Subscription(topics, self.max_queue)
+        with self._lock:
+            for topic in topics:
+                self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def publish(self, topics: list[str], event: dict):
+        """Send `event` to everyone subscribed to any of `topics`. Never blocks."""
+        loop = self._loop
+        with self._lock:
+            self.published += 1
+            if loop is None or not any(topic in self._subscribers for topic in topics):
+                return
+        try:
+            loop.call_soon_threadsafe(self._deliver, topics, event)
+        except RuntimeError:
+            # The loop has shut down; nobody is listening any more
+            pass
+
+    def _deliver(self, topics: list[str], event: dict):
+        with self._lock:
+            targets = set()
+            for topic in topics:
+                targets.update(self._subscribers.get(topic, ()))
+
+        for subscription in targets:
+            try:
+                subscription.queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self._evict(subscription)
+
+    def _evict(self, subscription: Subscription):
+        self.unsubscribe(subscription)
+        self.evicted += 1
+        # Make room for the notice; the backlog is useless once the client resyncs anyway
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(EVICTED)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len({s for subscribers in self._subscribers.values() for s in subscribers}),
+                "published": self.published,
+                "delivered": self.delivered,
+                "evicted": self.evicted,
+            }
@@ -0,0 +1,45 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicSweeper:
+    """Runs cleanup jobs every `interval_seconds` on a background daemon thread.
+
+    Jobs are plain callables (e.g. a store's purge_expired). A failing job is logged
+    and retried on the next run instead of stopping the thread.
+    """
+
+    def __init__(self, interval_seconds: float, jobs=(), name: str = "sweeper"):
+        self.interval_seconds = interval_seconds
+        self.jobs = list(jobs)
+        self.name = name
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self):
+        for job in self.jobs:
+            try:
+                removed = job()
+                if removed:
+                    logger.debug("%s removed %s expired entries", getattr(job, "__qualname__", job), removed)
+            except Exception:
+                logger.exception("Sweeper job %r failed", job)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class PoolSaturated(Exception):
+    """Raised when a BoundedWorkerPool already has as much work as it is allowed to hold."""
+
+
+class BoundedWorkerPool:
+    """A fixed-size thread pool that refuses new work instead of queueing without limit.
+
+    At most `max_workers` jobs run at once and at most `max_queue` more may wait.
+    Anything beyond that fails fast with PoolSaturated.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, name: str = "worker"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and wait for its result, blocking the calling thread."""
+        return self._submit(fn, *args).result()
+
+    async def run_async(self, fn, *args):
+        """Run fn(*args) on the pool and await its result, leaving the calling thread free.
+
+        If the caller is cancelled the job still finishes and keeps its slot until it does.
+        """
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolSaturated()
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Release when the job itself is done, not when the caller stops waiting
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "rejected": self.rejected,
+            }
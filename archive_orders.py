@@ -0,0 +1,44 @@
+"""Move old completed/cancelled orders to the archive tables, then give the freed space back.
+
+Runs the same job the server runs every ARCHIVE_INTERVAL_SECONDS; handy with
+ARCHIVE_INTERVAL_SECONDS=0 and a cron entry instead. Orders are moved in batches
+(ARCHIVE_BATCH_SIZE), so it's safe to run while the server is up. It shares a lock with
+backfill_rollups.py (job_locks table), so only one of the two runs at a time.
+
+    python archive_orders.py [older_than_days]
+
+Databases created before archival existed don't use incremental vacuum yet. Switch them
+over once, with the server stopped (this runs a full VACUUM):
+
+    python archive_orders.py --enable-incremental-vacuum
+"""
+import sys
+import time
+
+from app.config import settings
+from app.database import SessionLocal, init_db
+from app.services.archive_service import JobBusy, archive_orders, compact_database, enable_incremental_vacuum
+
+init_db()
+
+if "--enable-incremental-vacuum" in sys.argv:
+    start = time.perf_counter()
+    enable_incremental_vacuum()
+    print(f"✓ auto_vacuum is now INCREMENTAL ({time.perf_counter() - start:.1f}s)")
+    sys.exit()
+
+older_than_days = int(sys.argv[1]) if len(sys.argv) > 1 else settings.ARCHIVE_AFTER_DAYS
+db = SessionLocal()
+
+def report(moved):
+    print(f"  {moved} orders archived")
+
+start = time.perf_counter()
+try:
+    moved = archive_orders(db, older_than_days=older_than_days, progress=report)
+except JobBusy as error:
+    sys.exit(f"✗ {error}")
+finally:
+    db.close()
+pages = compact_database()
+print(f"✓ Archived {moved} orders older than {older_than_days} days, freed {pages} pages in {time.perf_counter() - start:.1f}s")
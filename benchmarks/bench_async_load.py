@@ -0,0 +1,135 @@
+"""Requests/sec of the sync and async database paths at high concurrency.
+
+Serves GET /orders/my-orders and GET /foods/categories two ways against the same
+seeded SQLite file and hammers both with many concurrent in-process clients:
+
+* sync:  def handlers on database.get_db (each request holds a threadpool slot)
+* async: the real async def handlers on database.get_async_db (aiosqlite)
+
+    python -m benchmarks.bench_async_load [--requests 2000] [--concurrency 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from benchmarks.common import make_session_factory, seed_menu, seed_user, summarize
+from app.api import foods, orders
+from app.database import get_async_db, get_db
+from app.models.food import Category
+from app.models.user import User
+from app.schemas.food import CategoryOut
+from app.schemas.order import OrderPage
+from app.services import order_service
+from app.services.auth_service import get_current_user, get_current_user_async
+from app.services.order_service import create_order
+
+
+def build_sync_app(current_user) -> FastAPI:
+    """The same two endpoints as plain def handlers on the sync session."""
+    app = FastAPI()
+
+    @app.get("/orders/my-orders", response_model=OrderPage)
+    def list_my_orders(db: Session = Depends(get_db)):
+        orders_page, next_cursor = order_service.get_user_orders(db, user_id=current_user.id)
+        return {"orders": orders_page, "next_cursor": next_cursor}
+
+    @app.get("/foods/categories", response_model=list[CategoryOut])
+    def get_categories(db: Session = Depends(get_db)):
+        return db.query(Category).all()
+
+    return app
+
+
+def build_async_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(foods.router)
+    app.include_router(orders.router)
+    return app
+
+
+async def drive(app: FastAPI, path: str, total: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                samples.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+
+    return {"requests_per_second": round(total / elapsed, 1), **summarize(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=200, help="orders in the benchmark user's history")
+    args = parser.parse_args()
+
+    # Sync handlers keep their pooled connection until get_db's teardown runs, and that teardown
+    # needs a free threadpool thread. At this concurrency a bounded pool starves itself until it
+    # times out, so the sync path gets an unbounded NullPool (SQLite connections are cheap).
+    SessionLocal, path = make_session_factory(poolclass=NullPool)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    try:
+        with SessionLocal() as db:
+            food_ids = seed_menu(db, 5)
+            user_id = seed_user(db)
+            for _ in range(args.orders):
+                create_order(db, user_id, [{"food_id": food_id, "quantity": 1} for food_id in food_ids])
+            db.add(Category(name="Drinks"))
+            db.commit()
+            current_user = db.get(User, user_id)
+            db.expunge(current_user)
+
+        def override_get_db():
+            with SessionLocal() as db:
+                yield db
+
+        async def override_get_async_db():
+            async with AsyncSessionLocal() as db:
+                yield db
+
+        sync_app = build_sync_app(current_user)
+        async_app = build_async_app()
+        for app in (sync_app, async_app):
+            app.dependency_overrides[get_db] = override_get_db
+            app.dependency_overrides[get_async_db] = override_get_async_db
+            app.dependency_overrides[get_current_user] = lambda: current_user
+            app.dependency_overrides[get_current_user_async] = lambda: current_user
+
+        async def run_all():
+            # One event loop for everything: the async engine's pool is bound to the loop it was used on
+            results = []
+            for path_ in ("/orders/my-orders", "/foods/categories"):
+                for mode, app in (("sync", sync_app), ("async", async_app)):
+                    stats = await drive(app, path_, args.requests, args.concurrency)
+                    results.append({"endpoint": path_, "mode": mode, "concurrency": args.concurrency, **stats})
+            await async_engine.dispose()
+            return results
+
+        print(json.dumps(asyncio.run(run_all()), indent=2))
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
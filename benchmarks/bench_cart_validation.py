@@ -0,0 +1,57 @@
+"""Checkout validation latency against cart size.
+
+Compares the old one-query-per-line validator with the batched
+food_service.validate_food_availability for carts of 1, 10 and 100 lines.
+
+    python -m benchmarks.bench_cart_validation
+"""
+import json
+import os
+
+from fastapi import HTTPException, status
+
+from benchmarks.common import make_session_factory, seed_menu, summarize, timed
+from app.models.food import Food
+from app.services.food_service import validate_food_availability
+
+CART_SIZES = [1, 10, 100]
+REPEAT = 200
+
+
+def validate_per_line(db, cart_items):
+    """The previous implementation: one SELECT per cart line."""
+    total_amount = 0.0
+    validated_items = []
+    for item in cart_items:
+        food = db.query(Food).filter(Food.id == item["food_id"]).first()
+        if not food or not food.is_available:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="unavailable")
+        total_amount += food.price * item["quantity"]
+        validated_items.append({"food": food, "quantity": item["quantity"]})
+    return total_amount, validated_items
+
+
+def main():
+    SessionLocal, path = make_session_factory()
+    try:
+        with SessionLocal() as db:
+            food_ids = seed_menu(db, max(CART_SIZES))
+
+        results = []
+        for size in CART_SIZES:
+            cart = [{"food_id": food_id, "quantity": 2} for food_id in food_ids[:size]]
+            for name, validator in (("per_line", validate_per_line), ("batched", validate_food_availability)):
+                def run():
+                    # A fresh session per call so the identity map doesn't hide round trips
+                    with SessionLocal() as db:
+                        validator(db, cart)
+
+                results.append({"cart_lines": size, "validator": name, **summarize(timed(run, REPEAT))})
+
+        print(json.dumps(results, indent=2))
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
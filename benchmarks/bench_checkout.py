@@ -0,0 +1,84 @@
+"""Concurrent checkout throughput.
+
+Runs the same batch of checkouts through the previous two-commit create_order
+and the current single-transaction order_service.create_order, from several
+threads at once, and reports orders per second.
+
+    python -m benchmarks.bench_checkout [--orders 400] [--threads 8] [--lines 5]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import make_session_factory, seed_menu, seed_user
+from app.models.order import Order, OrderItem
+from app.services.food_service import validate_food_availability
+from app.services.order_service import create_order
+
+
+def create_order_two_commits(db, user_id, cart_items):
+    """The previous implementation: commit the order, then add items one by one and commit again."""
+    total_amount, validate_items = validate_food_availability(db, cart_items)
+    new_order = Order(user_id=user_id, total_amount=total_amount, status="pending")
+    db.add(new_order)
+    db.commit()
+    db.refresh(new_order)
+
+    for item in validate_items:
+        food = item["food"]
+        db.add(OrderItem(order_id=new_order.id, food_id=food.id, quantity=item["quantity"], unit_price=food.price))
+
+    db.commit()
+    db.refresh(new_order)
+    return new_order
+
+
+def run(name, create, orders, threads, lines):
+    SessionLocal, path = make_session_factory()
+    try:
+        with SessionLocal() as db:
+            food_ids = seed_menu(db, lines)
+            user_id = seed_user(db)
+        cart = [{"food_id": food_id, "quantity": 1} for food_id in food_ids]
+
+        def checkout(_):
+            with SessionLocal() as db:
+                order = create(db, user_id, cart)
+                # The checkout endpoint reads these back for its response
+                return order.id, order.total_amount
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(checkout, range(orders)))
+        elapsed = time.perf_counter() - start
+
+        return {
+            "implementation": name,
+            "orders": orders,
+            "threads": threads,
+            "cart_lines": lines,
+            "seconds": round(elapsed, 3),
+            "orders_per_second": round(orders / elapsed, 1),
+        }
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--lines", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [
+        run("two_commits", create_order_two_commits, args.orders, args.threads, args.lines),
+        run("single_transaction", create_order, args.orders, args.threads, args.lines),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
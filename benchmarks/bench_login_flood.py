@@ -0,0 +1,159 @@
+"""Menu latency while one client floods POST /auth/login.
+
+Drives the real app in-process (httpx ASGI transport) against a throwaway SQLite file.
+First GET /foods/ is measured on its own, then again while `--flood-concurrency` workers
+from a single attacker IP send wrong-password logins for a real account at a combined
+`--flood-rps`. The attacker runs in the same process and event loop as the server, so its
+rate is capped to keep its own client-side cost the same in both modes.
+
+With the auth rate limits on, the flood is mostly answered with 429 before bcrypt runs
+(see "bcrypt_checks"); run with --disable-rate-limit to compare.
+
+    python -m benchmarks.bench_login_flood [--menu-requests 500] [--flood-rps 50]
+    python -m benchmarks.bench_login_flood --disable-rate-limit
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+
+VICTIM_EMAIL = "victim@bench.example"
+LEGIT_CLIENT = ("10.0.0.2", 40000)
+ATTACKER_CLIENT = ("10.0.0.66", 40000)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--foods", type=int, default=100)
+    parser.add_argument("--menu-requests", type=int, default=500)
+    parser.add_argument("--menu-concurrency", type=int, default=10)
+    parser.add_argument("--flood-concurrency", type=int, default=50)
+    parser.add_argument("--flood-rps", type=float, default=50, help="combined attacker request rate")
+    parser.add_argument("--bcrypt-rounds", type=int, default=None)
+    parser.add_argument("--disable-rate-limit", action="store_true")
+    return parser.parse_args()
+
+
+async def measure_menu(transport, total: int, concurrency: int) -> dict:
+    import httpx
+
+    from benchmarks.common import summarize
+
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/foods/")
+                samples.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+
+        await asyncio.gather(*(one() for _ in range(total)))
+
+    return summarize(samples)
+
+
+async def flood(transport, workers: int, rps: float, stop: asyncio.Event) -> Counter:
+    import httpx
+
+    statuses = Counter()
+    interval = workers / rps
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def attacker(n: int):
+            attempt = 0
+            # Spread the workers out instead of firing them all at once
+            await asyncio.sleep(interval * n / workers)
+            while not stop.is_set():
+                attempt += 1
+                start = time.perf_counter()
+                response = await client.post(
+                    "/auth/login", json={"email": VICTIM_EMAIL, "password": f"guess-{n}-{attempt}"}
+                )
+                statuses[response.status_code] += 1
+                await asyncio.sleep(max(0.0, interval - (time.perf_counter() - start)))
+
+        await asyncio.gather(*(attacker(n) for n in range(workers)))
+
+    return statuses
+
+
+def main():
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="chucks_flood_") as directory:
+        # Must happen before anything under app/ is imported
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'flood.db')}"
+        os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+        # Per-request INFO logs and slow-login warnings would cost more than the 429s themselves
+        os.environ.setdefault("LOG_LEVEL", "ERROR")
+        os.environ["RATE_LIMIT_ENABLED"] = "false" if args.disable_rate_limit else "true"
+        if args.bcrypt_rounds is not None:
+            os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+
+        import httpx
+
+        from app.main import app
+        from app.config import settings
+        from app.database import SessionLocal, init_db
+        from app.models.user import User
+        from app.services.auth_service import get_password_hash
+        from benchmarks.common import seed_menu
+
+        init_db()
+        with SessionLocal() as db:
+            seed_menu(db, args.foods)
+            db.add(User(
+                email=VICTIM_EMAIL,
+                phone="08000000000",
+                hashed_password=get_password_hash("the-real-password"),
+                is_verified=True
+            ))
+            db.commit()
+
+        legit = httpx.ASGITransport(app=app, client=LEGIT_CLIENT)
+        attacker = httpx.ASGITransport(app=app, client=ATTACKER_CLIENT)
+
+        async def run():
+            baseline = await measure_menu(legit, args.menu_requests, args.menu_concurrency)
+
+            stop = asyncio.Event()
+            flood_task = asyncio.create_task(flood(attacker, args.flood_concurrency, args.flood_rps, stop))
+            # Let the flood get going (and the limiter's burst allowance drain) first
+            await asyncio.sleep(0.5)
+            start = time.perf_counter()
+            during = await measure_menu(legit, args.menu_requests, args.menu_concurrency)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            statuses = await flood_task
+            return baseline, during, statuses, elapsed
+
+        baseline, during, statuses, elapsed = asyncio.run(run())
+
+        report = {
+            "config": {
+                "rate_limit_enabled": settings.RATE_LIMIT_ENABLED,
+                "login_rate_limit_per_ip": settings.LOGIN_RATE_LIMIT_PER_IP,
+                "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+                "flood_concurrency": args.flood_concurrency,
+                "flood_rps": args.flood_rps,
+                "menu_requests": args.menu_requests,
+            },
+            "menu_idle": baseline,
+            "menu_during_flood": during,
+            "flood_responses": {str(code): count for code, count in sorted(statuses.items())},
+            "flood_requests_per_second": round(sum(statuses.values()) / elapsed, 1),
+            # 401s (and any 200s) are the attempts that actually ran bcrypt
+            "bcrypt_checks": statuses[401] + statuses[200],
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
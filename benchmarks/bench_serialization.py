@@ -0,0 +1,98 @@
+"""Cost of turning list responses into JSON, per 1k items.
+
+Compares, for List[FoodOut] (the menu) and List[OrderOut] (order history, 3 items each):
+
+* default:   what FastAPI does with a response_model: validate every object through the
+             schema, dump to Python, run jsonable_encoder, then json.dumps it
+* adapter:   a precompiled TypeAdapter validating the ORM objects and dumping JSON directly
+* orjson:    the same TypeAdapter dumping to Python, encoded with orjson (slower than
+             dump_json for models; FastJSONResponse only uses orjson for plain content)
+* cached:    re-sending bytes encoded once (the menu's steady state with FAST_JSON on)
+
+    python -m benchmarks.bench_serialization [--items 1000] [--repeat 50]
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from benchmarks.common import summarize, timed
+from app.models.food import Food
+from app.models.order import Order, OrderItem
+from app.schemas.food import FoodOut
+from app.schemas.order import OrderOut
+from app.utils.fast_json import ResponseEncoder, orjson
+
+
+def make_foods(count: int) -> list[Food]:
+    return [
+        Food(id=i, name=f"Dish {i}", description="Benchmark dish with a longer description",
+             price=1000.0 + i, category_id=1 + i % 4, is_available=True)
+        for i in range(count)
+    ]
+
+
+def make_orders(count: int) -> list[Order]:
+    now = datetime(2024, 1, 1)
+    orders = []
+    for i in range(count):
+        order = Order(id=i, user_id=1, total_amount=4500.0, status="completed", created_at=now - timedelta(hours=i))
+        order.items = [OrderItem(id=i * 3 + n, order_id=i, food_id=n + 1, quantity=1, unit_price=1500.0) for n in range(3)]
+        orders.append(order)
+    return orders
+
+
+def default_path(adapter: TypeAdapter, objects) -> bytes:
+    # fastapi.routing.serialize_response + JSONResponse.render
+    value = adapter.validate_python(objects, from_attributes=True)
+    content = jsonable_encoder(adapter.dump_python(value, mode="json"))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def adapter_path(adapter: TypeAdapter, objects) -> bytes:
+    # What ResponseEncoder.encode does
+    return adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+
+def orjson_path(adapter: TypeAdapter, objects) -> bytes:
+    return orjson.dumps(adapter.dump_python(adapter.validate_python(objects, from_attributes=True)))
+
+
+def per_1k_items(samples: list[float], items: int) -> dict:
+    scale = 1000 / items
+    return {key: value if key == "count" else round(value * scale, 3) for key, value in summarize(samples).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    report = {}
+    for name, schema, objects in (
+        ("foods", List[FoodOut], make_foods(args.items)),
+        ("orders", List[OrderOut], make_orders(args.items)),
+    ):
+        adapter = ResponseEncoder(schema).adapter
+        encoded = adapter_path(adapter, objects)
+        paths = {"default": default_path, "adapter": adapter_path}
+        if orjson is not None:
+            paths["orjson"] = orjson_path
+
+        results = {}
+        for path_name, path in paths.items():
+            # Every path must produce the same document
+            assert json.loads(path(adapter, objects)) == json.loads(encoded), path_name
+            results[path_name] = per_1k_items(timed(lambda: path(adapter, objects), args.repeat), args.items)
+        results["cached"] = per_1k_items(timed(lambda: bytes(encoded), args.repeat), args.items)
+        report[name] = {"ms_per_1k_items": results, "bytes": len(encoded)}
+
+    print(json.dumps({"items": args.items, "repeat": args.repeat, "results": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Shared helpers for the benchmark scripts in this folder.
+
+Benchmarks run against a throwaway SQLite file so they never touch chucks_kitchen.db.
+"""
+import os
+import statistics
+import tempfile
+import time
+
+# Settings are read when app.config is imported, so give it something to work with
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./chucks_kitchen.db")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.food import Category, Food
+from app.models.order import Order, OrderItem  # noqa: F401 (register tables)
+from app.models.user import User
+
+
+def make_session_factory(path: str | None = None, **engine_kwargs):
+    """Create a fresh SQLite database with the app schema and return (sessionmaker, path)."""
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="chucks_bench_", suffix=".db")
+        os.close(fd)
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, **engine_kwargs)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine), path
+
+
+def seed_menu(db, food_count: int) -> list[int]:
+    """Insert one category and `food_count` available foods, returning the food ids."""
+    category = Category(name="Main Dish")
+    db.add(category)
+    db.flush()
+
+    foods = [
+        Food(name=f"Dish {i}", description="Benchmark dish", price=1000.0 + i, category_id=category.id)
+        for i in range(food_count)
+    ]
+    db.add_all(foods)
+    db.commit()
+    return [food.id for food in foods]
+
+
+def seed_user(db, email: str = "bench@example.com") -> int:
+    user = User(email=email, phone="08000000000", hashed_password="x", is_verified=True)
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def timed(fn, repeat: int) -> list[float]:
+    """Call fn() `repeat` times and return the wall time of each call in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p95_ms": round(percentile(ordered, 0.95), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+    }
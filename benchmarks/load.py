@@ -0,0 +1,239 @@
+"""HTTP load benchmark for the ordering hot paths.
+
+Drives the real FastAPI app in-process (httpx ASGI transport, no network) against a
+freshly seeded SQLite database, and reports p50/p95/p99 latency and throughput per
+scenario as JSON:
+
+* menu       GET  /foods/
+* login      POST /auth/login
+* checkout   POST /cart/add followed by POST /cart/checkout (timed together)
+* my_orders  GET  /orders/my-orders
+
+Save a run and compare a later one against it:
+
+    python -m benchmarks.load --output before.json
+    python -m benchmarks.load --compare before.json
+
+Seeding is controlled by --users, --foods and --orders-per-user. bcrypt dominates the
+login scenario, so --bcrypt-rounds defaults to the application's own setting.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+SCENARIOS = ("menu", "login", "checkout", "my_orders")
+PASSWORD = "benchmark-password"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--foods", type=int, default=100)
+    parser.add_argument("--orders-per-user", type=int, default=25)
+    parser.add_argument("--requests", type=int, default=500, help="operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated subset of %s" % (SCENARIOS,))
+    parser.add_argument("--bcrypt-rounds", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=1234, help="random seed, for reproducible data and traffic")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="a previous JSON report to compare against")
+    return parser.parse_args()
+
+
+def configure_environment(args, directory: str):
+    # Must happen before anything under app/ is imported: Settings and the engines read it at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'load.db')}"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    # Every simulated user shares one client IP, so the auth rate limits would turn
+    # the login scenario into a 429 benchmark
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    if args.bcrypt_rounds is not None:
+        os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+
+
+def seed_database(args, rng: random.Random) -> list[str]:
+    """Seed users, foods and historical orders in bulk. Returns the user emails."""
+    from app.database import SessionLocal, engine
+    from app.models.food import Category, Food
+    from app.models.user import User
+    from app.services.auth_service import get_password_hash
+    from app.utils.pagination import sqlite_timestamp
+
+    with SessionLocal() as db:
+        categories = [Category(name=name) for name in ("Sides", "Main Dish", "Drinks", "Desserts")]
+        db.add_all(categories)
+        db.flush()
+
+        foods = [
+            Food(
+                name=f"Dish {i}",
+                description=f"Benchmark dish number {i}",
+                price=round(rng.uniform(500, 5000), 2),
+                category_id=rng.choice(categories).id,
+            )
+            for i in range(args.foods)
+        ]
+        db.add_all(foods)
+
+        # One hash for everyone keeps seeding fast; logins still pay for a full bcrypt check
+        hashed_password = get_password_hash(PASSWORD)
+        emails = [f"user{i}@bench.example" for i in range(args.users)]
+        db.add_all(
+            User(email=email, phone="08000000000", hashed_password=hashed_password, is_verified=True)
+            for email in emails
+        )
+        db.commit()
+
+        food_prices = [(food.id, food.price) for food in foods]
+
+    # Orders go in through the DBAPI directly: it's much faster, and lets created_at be spread
+    # over the past year in the same text format SQLite's CURRENT_TIMESTAMP uses.
+    now = datetime.now(timezone.utc)
+    orders, items = [], []
+    order_id = 0
+    for user_id in range(1, args.users + 1):
+        for _ in range(args.orders_per_user):
+            order_id += 1
+            lines = rng.sample(food_prices, k=min(len(food_prices), rng.randint(1, 4)))
+            quantities = [rng.randint(1, 3) for _ in lines]
+            total = sum(price * quantity for (_, price), quantity in zip(lines, quantities))
+            created_at = sqlite_timestamp(now - timedelta(minutes=rng.randint(1, 525600)))
+            status = rng.choice(["completed", "completed", "completed", "cancelled", "pending"])
+            orders.append((order_id, user_id, total, status, created_at))
+            items.extend(
+                (order_id, food_id, quantity, price) for (food_id, price), quantity in zip(lines, quantities)
+            )
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO orders (id, user_id, total_amount, status, created_at) VALUES (?, ?, ?, ?, ?)", orders
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO order_items (order_id, food_id, quantity, unit_price) VALUES (?, ?, ?, ?)", items
+        )
+
+    return emails
+
+
+async def run_scenario(name, app, emails, food_ids, args, rng):
+    import httpx
+
+    from benchmarks.common import summarize
+
+    transport = httpx.ASGITransport(app=app)
+    per_worker = [args.requests // args.concurrency] * args.concurrency
+    for i in range(args.requests % args.concurrency):
+        per_worker[i] += 1
+
+    samples, errors = [], 0
+
+    async def worker(operations: int, email: str):
+        nonlocal errors
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Log in once up front (untimed) for the scenarios that need a session
+            if name in ("checkout", "my_orders"):
+                response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+                response.raise_for_status()
+
+            for _ in range(operations):
+                start = time.perf_counter()
+                if name == "menu":
+                    responses = [await client.get("/foods/")]
+                elif name == "login":
+                    responses = [await client.post("/auth/login", json={"email": email, "password": PASSWORD})]
+                elif name == "checkout":
+                    added = await client.post("/cart/add", json={"food_id": rng.choice(food_ids), "quantity": 1})
+                    responses = [added, await client.post("/cart/checkout")]
+                else:
+                    responses = [await client.get("/orders/my-orders")]
+                elapsed = (time.perf_counter() - start) * 1000
+
+                if all(response.status_code < 400 for response in responses):
+                    samples.append(elapsed)
+                else:
+                    errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(count, rng.choice(emails)) for count in per_worker if count))
+    elapsed = time.perf_counter() - start
+
+    report = {"errors": errors, "throughput_rps": round(len(samples) / elapsed, 1)}
+    if samples:
+        report.update(summarize(samples))
+    return report
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Percentage change per scenario for p50/p95/p99 and throughput (negative latency = faster)."""
+    changes = {}
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        changes[name] = {
+            metric: round((result[metric] - before[metric]) / before[metric] * 100, 1)
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+            if before.get(metric) and metric in result
+        }
+    return changes
+
+
+def main():
+    args = parse_args()
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenarios: {sorted(unknown)}")
+
+    with tempfile.TemporaryDirectory(prefix="chucks_load_") as directory:
+        configure_environment(args, directory)
+        rng = random.Random(args.seed)
+
+        from app.main import app
+        from app.config import settings
+        from app.database import init_db
+
+        init_db()
+        emails = seed_database(args, rng)
+
+        from app.database import SessionLocal
+        from app.models.food import Food
+
+        with SessionLocal() as db:
+            food_ids = [food_id for (food_id,) in db.query(Food.id)]
+
+        async def run_all():
+            return {name: await run_scenario(name, app, emails, food_ids, args, rng) for name in scenarios}
+
+        report = {
+            "config": {
+                "users": args.users,
+                "foods": args.foods,
+                "orders_per_user": args.orders_per_user,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+                "seed": args.seed,
+            },
+            "results": asyncio.run(run_all()),
+        }
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            report["change_percent"] = compare(report, json.load(baseline_file))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from app.database import SessionLocal
 from app.models.user import User
+from app.config import settings
 
 db = SessionLocal()
 
@@ -9,7 +10,9 @@ user = db.query(User).filter(User.email == admin).first()
 if user:
     user.is_admin = True
     db.commit()
-    print(f"✓ {admin} is now an Admin")
+    # Running servers keep their cached identity for this user until it expires;
+    # there is nothing in this process that could clear it for them
+    print(f"✓ {admin} is now an Admin (live within {settings.IDENTITY_CACHE_TTL_SECONDS}s on running servers)")
 else:
     print("User not found")
 
@@ -0,0 +1,68 @@
+import itertools
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import select
+
+# Point the app at a throwaway database before anything under app/ reads its settings
+_test_dir = tempfile.mkdtemp(prefix="chucks_tests_")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_test_dir, 'test.db')}")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+_names = itertools.count(1)
+
+
+@pytest.fixture
+def db():
+    from app.database import SessionLocal, init_db
+    from app.services import kitchen_service
+
+    init_db()
+    kitchen_service.kitchen_queue.reset()
+    with SessionLocal() as session:
+        yield session
+    kitchen_service.kitchen_queue.reset()
+
+
+@pytest.fixture
+def menu(db):
+    """Two fresh foods, so each test reads its own rollup rows."""
+    from app.models.food import Category, Food
+    from app.services.food_service import seed_categories
+
+    seed_categories(db, ["Main Dish"])
+    category_id = db.scalar(select(Category.id).where(Category.name == "Main Dish"))
+    n = next(_names)
+    foods = [Food(name=f"Jollof {n}", price=10.0, category_id=category_id),
+             Food(name=f"Puff puff {n}", price=2.5, category_id=category_id)]
+    db.add_all(foods)
+    db.commit()
+    return foods
+
+
+@pytest.fixture
+def place_order(db, menu):
+    """place_order(status="pending", lines=[(food_index, quantity), ...]) -> order id, all for place_order.user_id."""
+    from app.models.user import User
+    from app.services import order_service
+
+    user = User(email=f"customer{next(_names)}@example.com", hashed_password="x", is_verified=True)
+    db.add(user)
+    db.commit()
+
+    def place(status="pending", lines=((0, 2), (1, 4))):
+        order = order_service.create_order(
+            db, user.id, [{"food_id": menu[index].id, "quantity": quantity} for index, quantity in lines]
+        )
+        path = {"pending": [], "confirmed": ["confirmed"], "preparing": ["confirmed", "preparing"],
+                "out_for_delivery": ["confirmed", "preparing", "out_for_delivery"],
+                "completed": ["confirmed", "preparing", "out_for_delivery", "completed"],
+                "cancelled": ["cancelled"]}[status]
+        for step in path:
+            order_service.update_order_status(db, order.id, step)
+        return order.id
+
+    place.user_id = user.id
+    return place
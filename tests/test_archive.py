@@ -0,0 +1,198 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select, text, update
+
+from app.database import AsyncSessionLocal, async_engine
+from app.models.job_lock import JobLock
+from app.models.order import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from app.models.sales import DailyFoodSales
+from app.services import order_service
+from app.services.analytics_service import rebuild_rollups
+from app.services.archive_service import (
+    ORDER_HISTORY_LOCK, JobBusy, JobLease, archive_orders, order_history_lock, run_archive_job
+)
+from app.utils.clock import utcnow
+from app.utils.pagination import sqlite_timestamp
+
+
+def _age(db, order_id: int, days: int):
+    """Backdate an order, stored the way SQLite's CURRENT_TIMESTAMP would have."""
+    db.execute(
+        text("UPDATE orders SET created_at = :created_at WHERE id = :id"),
+        {"created_at": sqlite_timestamp(utcnow().replace(microsecond=0) - timedelta(days=days)), "id": order_id}
+    )
+    db.commit()
+
+
+def _all_pages(db, user_id: int, limit: int) -> list[int]:
+    order_ids, cursor = [], None
+    while True:
+        orders, cursor = order_service.get_user_orders(db, user_id, limit=limit, cursor=cursor)
+        order_ids += [order.id for order in orders]
+        if cursor is None:
+            return order_ids
+
+
+def test_archiving_younger_than_the_setting_keeps_history_complete(db, place_order):
+    # Ages 1..6 days, newest first once paged; all far younger than ARCHIVE_AFTER_DAYS
+    order_ids = [place_order("completed") for _ in range(6)]
+    for age, order_id in enumerate(reversed(order_ids), start=1):
+        _age(db, order_id, age)
+    # Still live, and older than everything archived
+    stuck = [place_order("pending") for _ in range(3)]
+    for age, order_id in enumerate(stuck, start=10):
+        _age(db, order_id, age)
+    fresh = place_order("pending")
+
+    assert archive_orders(db, older_than_days=3) == 4
+
+    expected = [fresh, *reversed(order_ids), *stuck]
+    for limit in (1, 2, 3, 10):
+        assert _all_pages(db, place_order.user_id, limit) == expected
+
+
+def test_admin_list_and_export_only_read_the_archive_when_asked(db, place_order):
+    archived, live = place_order("cancelled"), place_order("pending")
+    _age(db, archived, 400)
+    _age(db, live, 500)  # older still, so the archived order sorts between pages
+    place_order("pending")
+    assert archive_orders(db) == 1
+
+    def listed(include_archived, limit):
+        order_ids, cursor = [], None
+        while True:
+            orders, cursor = order_service.list_orders(
+                db, user_id=place_order.user_id, limit=limit, cursor=cursor, include_archived=include_archived
+            )
+            order_ids += [order.id for order in orders]
+            if cursor is None:
+                return order_ids
+
+    assert archived not in listed(False, 10)
+    for limit in (1, 2, 10):
+        assert listed(True, limit)[1:] == [archived, live]
+
+    def exported(include_archived, export_format):
+        return "".join(order_service.export_orders(
+            created_to=utcnow() - timedelta(days=300), export_format=export_format,
+            include_archived=include_archived, batch_size=1
+        ))
+
+    assert [json.loads(line)["id"] for line in exported(False, "ndjson").splitlines()] == [live]
+    lines = [json.loads(line) for line in exported(True, "ndjson").splitlines()]
+    assert [order["id"] for order in lines] == [live, archived]
+    assert [(item["quantity"], item["unit_price"]) for item in lines[1]["items"]] == [(2, 10.0), (4, 2.5)]
+
+    rows = list(csv.reader(io.StringIO(exported(True, "csv"))))
+    assert rows[0] == order_service.EXPORT_CSV_COLUMNS
+    assert [(int(row[0]), row[2]) for row in rows[1:]] == [(live, "pending")] * 2 + [(archived, "cancelled")] * 2
+
+
+def test_archiving_and_rollup_rebuild_never_overlap(db):
+    with order_history_lock():
+        with pytest.raises(JobBusy):
+            archive_orders(db)
+        with pytest.raises(JobBusy):
+            rebuild_rollups(db)
+        assert run_archive_job() == 0
+
+    # Released, so either can run again
+    archive_orders(db)
+    rebuild_rollups(db)
+
+
+def test_an_expired_lock_can_be_taken_over(db):
+    stale = JobLease(ORDER_HISTORY_LOCK)
+    assert stale.acquire()
+    db.execute(update(JobLock).values(expires_at=utcnow() - timedelta(seconds=1)))
+    db.commit()
+
+    with order_history_lock():
+        with pytest.raises(JobBusy):
+            stale.renew()
+    stale.release()  # no longer the holder, so this leaves nothing behind either way
+    assert db.scalar(select(func.count()).select_from(JobLock)) == 0
+
+
+def test_archive_moves_batches_with_their_items_and_keeps_the_newest_order(db, place_order):
+    order_ids = [place_order("completed") for _ in range(5)]
+    for order_id in order_ids:
+        _age(db, order_id, 200)
+    progress = []
+
+    assert archive_orders(db, batch_size=2, progress=progress.append) == 4
+    assert progress == [2, 4]
+
+    # The newest order stays put, however old: SQLite would reuse its id otherwise
+    assert db.scalars(select(Order.id).where(Order.id.in_(order_ids))).all() == order_ids[-1:]
+    assert db.scalars(select(ArchivedOrder.id).where(ArchivedOrder.id.in_(order_ids))).all() == order_ids[:-1]
+    assert db.scalar(select(func.count()).select_from(OrderItem).where(OrderItem.order_id.in_(order_ids[:-1]))) == 0
+    assert db.scalar(
+        select(func.count()).select_from(ArchivedOrderItem).where(ArchivedOrderItem.order_id.in_(order_ids[:-1]))
+    ) == 8
+
+    # Running again is a no-op until a newer order arrives
+    db.commit()
+    assert archive_orders(db) == 0
+    place_order("pending")
+    assert archive_orders(db) == 1
+
+
+def test_async_reads_fall_back_to_the_archive(db, place_order):
+    order_ids = [place_order("completed") for _ in range(4)]
+    for age, order_id in enumerate(reversed(order_ids), start=199):
+        _age(db, order_id, age)
+    fresh = place_order("pending")
+    assert archive_orders(db) == 4
+
+    async def read():
+        try:
+            async with AsyncSessionLocal() as session:
+                archived = await order_service.get_order_async(session, order_ids[0])
+                with pytest.raises(HTTPException) as missing:
+                    await order_service.get_order_async(session, 999999)
+
+                pages, cursor = [], None
+                while True:
+                    orders, cursor = await order_service.get_user_orders_async(
+                        session, place_order.user_id, limit=2, cursor=cursor
+                    )
+                    pages.append([order.id for order in orders])
+                    if cursor is None:
+                        return archived, missing.value.status_code, pages
+        finally:
+            await async_engine.dispose()
+
+    archived, missing_status, pages = asyncio.run(read())
+
+    assert (archived.id, archived.status, len(archived.items)) == (order_ids[0], "completed", 2)
+    assert missing_status == 404
+    # The first page straddles the hot table and the archive
+    assert pages == [[fresh, order_ids[-1]], order_ids[-2:-4:-1], order_ids[:1]]
+
+
+def test_rollup_rebuild_counts_archived_orders(db, menu, place_order):
+    kept, cancelled = place_order("completed"), place_order("cancelled")
+    for order_id in (kept, cancelled):
+        _age(db, order_id, 250)
+    place_order("pending")
+    assert archive_orders(db) == 2
+
+    rebuild_rollups(db)
+
+    sold = db.execute(
+        select(DailyFoodSales.day, DailyFoodSales.orders, DailyFoodSales.quantity, DailyFoodSales.revenue)
+        .where(DailyFoodSales.food_id == menu[0].id)
+        .order_by(DailyFoodSales.day)
+    ).all()
+    # The cancelled order isn't a sale; the live pending one still counts, on today
+    assert sold == [
+        ((utcnow() - timedelta(days=250)).date(), 1, 2, 20.0),
+        (utcnow().date(), 1, 2, 20.0),
+    ]
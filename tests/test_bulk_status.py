@@ -0,0 +1,103 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, select
+
+from app.models.order import Order
+from app.models.sales import DailyFoodSales
+from app.services import kitchen_service, order_service
+
+
+@pytest.fixture
+def published(monkeypatch):
+    events = []
+    monkeypatch.setattr(
+        order_service, "publish_order_event",
+        lambda event_type, order, previous_status=None: events.append((order.id, order.status, previous_status))
+    )
+    return events
+
+
+@pytest.fixture
+def commits(db):
+    count = [0]
+
+    def on_commit(session):
+        count[0] += 1
+
+    event.listen(db, "after_commit", on_commit)
+    yield count
+    event.remove(db, "after_commit", on_commit)
+
+
+def _status(db, order_id):
+    db.expire_all()
+    return db.scalar(select(Order.status).where(Order.id == order_id))
+
+
+def test_mixed_duplicate_and_unknown_ids(db, place_order, published, commits):
+    pending, confirmed, completed = place_order("pending"), place_order("confirmed"), place_order("completed")
+    published.clear()
+    commits[0] = 0
+
+    results = order_service.bulk_update_order_status(
+        db, [confirmed, 999999, pending, confirmed, completed], "cancelled"
+    )
+
+    # One result per distinct id, in request order
+    assert [(r["order_id"], r["updated"]) for r in results] == [
+        (confirmed, True), (999999, False), (pending, True), (completed, False)
+    ]
+    assert results[1]["detail"] == "Order not found"
+    assert results[3]["status"] == "completed"
+    assert commits[0] == 1
+
+    assert [_status(db, order_id) for order_id in (pending, confirmed, completed)] == ["cancelled", "cancelled", "completed"]
+    assert published == [(confirmed, "cancelled", "confirmed"), (pending, "cancelled", "pending")]
+
+
+def test_nothing_valid_commits_nothing(db, place_order, published, commits):
+    completed = place_order("completed")
+    published.clear()
+    commits[0] = 0
+
+    results = order_service.bulk_update_order_status(db, [completed, 999999], "preparing")
+
+    assert not any(result["updated"] for result in results)
+    assert commits[0] == 0
+    assert published == []
+
+
+def test_unknown_status_is_rejected(db, place_order):
+    with pytest.raises(HTTPException) as error:
+        order_service.bulk_update_order_status(db, [place_order()], "eaten")
+    assert error.value.status_code == 400
+
+
+def test_cancelling_takes_orders_out_of_the_rollups(db, menu, place_order):
+    def sold():
+        db.expire_all()
+        return db.execute(
+            select(DailyFoodSales.orders, DailyFoodSales.quantity, DailyFoodSales.revenue)
+            .where(DailyFoodSales.food_id == menu[0].id)
+        ).one()
+
+    first, second, kept = place_order("pending"), place_order("confirmed"), place_order("pending")
+    assert sold() == (3, 6, 60.0)
+
+    order_service.bulk_update_order_status(db, [first, second], "cancelled")
+
+    assert sold() == (1, 2, 20.0)
+    assert _status(db, kept) == "pending"
+
+
+def test_kitchen_queue_follows_each_updated_order(db, menu, place_order):
+    queue = kitchen_service.kitchen_queue
+    pending, confirmed = place_order("pending"), place_order("confirmed")
+    assert queue.peek(10) == [(menu[0].id, {confirmed: 2}), (menu[1].id, {confirmed: 4})]
+
+    order_service.bulk_update_order_status(db, [pending], "confirmed")
+    assert queue.peek(10) == [(menu[0].id, {confirmed: 2, pending: 2}), (menu[1].id, {confirmed: 4, pending: 4})]
+
+    order_service.bulk_update_order_status(db, [confirmed], "cancelled")
+    assert queue.peek(10) == [(menu[0].id, {pending: 2}), (menu[1].id, {pending: 4})]
+
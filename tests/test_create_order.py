@@ -0,0 +1,14 @@
+from app.services import order_service
+
+
+def test_items_come_back_in_cart_order(db, menu, place_order):
+    cart = [(menu[1], 4), (menu[0], 2), (menu[1], 1)]
+
+    order = order_service.create_order(
+        db, place_order.user_id, [{"food_id": food.id, "quantity": quantity} for food, quantity in cart]
+    )
+
+    assert [(item.food_id, item.quantity, item.unit_price) for item in order.items] == [
+        (food.id, quantity, food.price) for food, quantity in cart
+    ]
+    assert order.total_amount == 4 * 2.5 + 2 * 10.0 + 2.5
@@ -0,0 +1,88 @@
+import io
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models.food import Food
+from app.services.food_import_service import import_foods, import_format_for
+
+
+def _import(db, content: str, import_format: str, batch_size: int = 500):
+    return import_foods(db, io.BytesIO(content.encode("utf-8")), import_format, batch_size=batch_size)
+
+
+def _stored(db, name: str):
+    db.expire_all()
+    return db.execute(
+        select(Food.price, Food.description, Food.is_available, Food.category_id).where(Food.name == name)
+    ).all()
+
+
+def test_csv_creates_updates_by_name_and_reports_bad_rows(db, menu):
+    existing = menu[0]
+    existing.description, existing.is_available = "smoky party rice", False
+    db.commit()
+    new_name = f"{existing.name} special"
+
+    report = _import(db, "\ufeff" + "\n".join([  # with the BOM spreadsheets add
+        "Name,Price,Category,Description",
+        f"{existing.name},12.5,main dish,",      # update: blank description is left alone
+        f"{new_name},8,Main Dish,with plantain",
+        "No price,,Main Dish,",
+        "Bad category,3,Breakfast,",
+        "Too many,3,Main Dish,x,extra",
+    ]), "csv")
+
+    assert (report.created, report.updated, report.failed) == (1, 1, 3)
+    assert [(error.row, error.name) for error in report.errors] == [
+        (3, "No price"), (4, "Bad category"), (5, "Too many")
+    ]
+    assert report.errors[0].errors == ["price: Field required"]
+    assert report.errors[1].errors == ["Unknown category 'Breakfast'"]
+
+    assert _stored(db, existing.name) == [(12.5, "smoky party rice", False, existing.category_id)]
+    assert _stored(db, new_name) == [(8.0, "with plantain", True, existing.category_id)]
+
+
+def test_jsonl_rows_merge_by_name_within_a_batch(db, menu):
+    category_id = menu[0].category_id
+    name = f"{menu[0].name} jsonl"
+
+    report = _import(db, "\n".join([
+        f'{{"name": "{name}", "price": 4, "category_id": {category_id}}}',
+        "",
+        "{not json",
+        "[1, 2]",
+        f'{{"name": "{name}", "price": 5, "category_id": {category_id}, "description": "later row wins"}}',
+        f'{{"name": "{menu[1].name}", "is_available": false, "category_id": {category_id}, "price": 2.5}}',
+        f'{{"name": "Lost", "price": 1, "category_id": 999999}}',
+    ]), "jsonl")
+
+    # A name repeated in one batch is one food, created once
+    assert (report.created, report.updated, report.failed) == (1, 1, 3)
+    assert [error.row for error in report.errors] == [3, 4, 7]
+    assert report.errors[0].errors[0].startswith("Invalid JSON")
+    assert report.errors[1].errors == ["Each line must be a JSON object"]
+
+    assert _stored(db, name) == [(5.0, "later row wins", True, category_id)]
+    assert _stored(db, menu[1].name) == [(2.5, None, False, category_id)]
+
+
+def test_repeats_across_batches_update_the_food_created_earlier(db, menu):
+    name = f"{menu[0].name} batched"
+    rows = [f"{name},{price},Main Dish" for price in (1, 2, 3)]
+
+    report = _import(db, "\n".join(["name,price,category", *rows]), "csv", batch_size=1)
+
+    assert (report.created, report.updated, report.failed) == (1, 2, 0)
+    assert [price for price, *_ in _stored(db, name)] == [3.0]
+
+
+def test_format_comes_from_the_query_or_the_extension():
+    assert import_format_for("menu.CSV", None) == "csv"
+    assert import_format_for("menu.ndjson", None) == "jsonl"
+    assert import_format_for("menu.txt", "jsonl") == "jsonl"
+    with pytest.raises(HTTPException) as error:
+        import_format_for("menu.txt", None)
+    assert error.value.status_code == 400
@@ -0,0 +1,108 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.order import Order
+from app.services import order_service
+from app.utils.kitchen_queue import KitchenQueue
+
+JOLLOF, PUFF_PUFF, ZOBO = 1, 2, 3
+
+
+def _queue() -> KitchenQueue:
+    queue = KitchenQueue()
+    queue.add_order(4, 1, [(JOLLOF, 2), (PUFF_PUFF, 6)])
+    queue.add_order(7, 2, [(ZOBO, 1), (JOLLOF, 3)])
+    queue.add_order(9, 3, [(JOLLOF, 1), (JOLLOF, 1)])
+    return queue
+
+
+def _drain(queue: KitchenQueue) -> list:
+    batches = []
+    while (batch := queue.claim()) is not None:
+        batches.append(batch)
+    return batches
+
+
+def test_claim_batches_a_food_across_orders_oldest_first():
+    queue = _queue()
+
+    assert queue.claim() == (JOLLOF, {4: 2, 7: 3, 9: 2})
+    assert queue.claim() == (PUFF_PUFF, {4: 6})
+    assert queue.claim() == (ZOBO, {7: 1})
+    assert queue.claim() is None
+    assert queue.stats() == {"orders": 0, "foods": 0, "quantity": 0}
+
+
+def test_claimed_and_removed_lines_are_skipped_lazily():
+    queue = _queue()
+    queue.claim()  # jollof for 4, 7 and 9; their other heap entries for jollof are now stale
+    queue.remove_order(7)
+
+    # Order 9's jollof entry is still on the heap but must not produce a batch
+    assert len(queue._heap) > 1
+    assert _drain(queue) == [(PUFF_PUFF, {4: 6})]
+    assert queue._heap == []
+
+
+def test_peek_matches_what_claim_hands_out():
+    queue = _queue()
+    queue.remove_order(4)
+
+    peeked = queue.peek(10)
+    assert peeked == [(JOLLOF, {7: 3, 9: 2}), (ZOBO, {7: 1})]
+    assert queue.peek(1) == peeked[:1]
+    assert _drain(queue) == peeked
+
+
+def test_peek_does_not_take_anything():
+    queue = _queue()
+    queue.peek(10)
+
+    assert queue.stats() == {"orders": 3, "foods": 3, "quantity": 14}
+
+
+def test_remove_order_after_a_partial_claim():
+    queue = _queue()
+    queue.claim()  # jollof, so order 4 only waits on puff puff and order 7 on zobo
+
+    queue.remove_order(4)
+    queue.remove_order(9)  # nothing left waiting for it
+
+    assert queue.stats() == {"orders": 1, "foods": 1, "quantity": 1}
+    assert _drain(queue) == [(ZOBO, {7: 1})]
+
+
+def test_adding_an_order_twice_does_nothing():
+    queue = _queue()
+    queue.add_order(4, 1, [(JOLLOF, 2), (PUFF_PUFF, 6)])
+    queue.claim()
+    queue.add_order(4, 1, [(JOLLOF, 2)])  # partly claimed
+
+    assert queue.peek(10) == [(PUFF_PUFF, {4: 6}), (ZOBO, {7: 1})]
+
+
+def test_restore_puts_a_batch_back_in_place():
+    queue = _queue()
+    food_id, lines = queue.claim()
+    queue.remove_order(9)  # cancelled while the batch was out
+
+    queue.restore(food_id, lines)
+
+    assert _drain(queue) == [(JOLLOF, {4: 2, 7: 3}), (PUFF_PUFF, {4: 6}), (ZOBO, {7: 1})]
+
+
+def test_failed_kitchen_claim_keeps_the_batch_queued(db, menu, place_order, monkeypatch):
+    confirmed = place_order("confirmed")
+
+    def broken(db, order_ids, new_status):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(order_service, "bulk_update_order_status", broken)
+    with pytest.raises(RuntimeError):
+        order_service.claim_kitchen_batch(db)
+    monkeypatch.undo()
+
+    batch = order_service.claim_kitchen_batch(db)
+    assert (batch["food_id"], batch["orders"]) == (menu[0].id, [{"order_id": confirmed, "quantity": 2}])
+    db.expire_all()
+    assert db.scalar(select(Order.status).where(Order.id == confirmed)) == "preparing"
@@ -0,0 +1,98 @@
+import asyncio
+import io
+import itertools
+
+import pytest
+from sqlalchemy import delete
+
+from app.database import AsyncSessionLocal, async_engine
+from app.models.food import Category
+from app.services import food_service
+from app.services.food_import_service import import_foods
+
+_suffixes = itertools.count(1)
+_TEST_CATEGORY = "Test category"
+
+
+@pytest.fixture(autouse=True)
+def _drop_test_categories(db):
+    # Other tests expect exactly the seeded categories
+    yield
+    db.rollback()
+    db.execute(delete(Category).where(Category.name.startswith(_TEST_CATEGORY)))
+    db.commit()
+
+
+def _search(term: str) -> list[str]:
+    async def run():
+        try:
+            async with AsyncSessionLocal() as session:
+                return await food_service.search_foods_async(session, term)
+        finally:
+            await async_engine.dispose()
+
+    return [food.name for food in asyncio.run(run())]
+
+
+def _prime(db, menu):
+    """Fill both caches through the normal read paths."""
+    food_service.invalidate_menu_cache()
+    food_service.list_foods(db)
+    food_service.get_menu_item(db, menu[0].id)
+    _search("jollof")
+    assert food_service.menu_cache.stats()["size"] == 2
+    assert food_service.search_cache.stats()["size"] == 1
+    return food_service.menu_validators()[0]
+
+
+def _import(db, content: str):
+    return import_foods(db, io.BytesIO(content.encode("utf-8")), "csv")
+
+
+WRITES = {
+    "create_category": lambda db, menu: food_service.create_category(db, f"{_TEST_CATEGORY} {next(_suffixes)}"),
+    "seed_categories": lambda db, menu: food_service.seed_categories(db, [f"{_TEST_CATEGORY} {next(_suffixes)}"]),
+    "create_food": lambda db, menu: food_service.create_food(
+        db, f"Zobo {next(_suffixes)}", "chilled", 1.5, menu[0].category_id
+    ),
+    "update_availability": lambda db, menu: food_service.update_food_availability(db, menu[0].id, False),
+    "update_price": lambda db, menu: food_service.update_food_details(db, menu[0].id, {"price": 11.0}),
+    "rename": lambda db, menu: food_service.update_food_details(db, menu[0].id, {"name": f"{menu[0].name} deluxe"}),
+    "import": lambda db, menu: _import(db, f"name,price,category\n{menu[1].name},3,Main Dish\n"),
+}
+
+
+@pytest.mark.parametrize("write", WRITES.values(), ids=WRITES.keys())
+def test_every_menu_write_clears_both_caches(db, menu, write):
+    etag = _prime(db, menu)
+
+    write(db, menu)
+
+    assert food_service.menu_cache.stats()["size"] == 0
+    assert food_service.search_cache.stats()["size"] == 0
+    assert food_service.menu_validators()[0] != etag
+
+
+def test_writes_that_change_nothing_keep_the_caches(db, menu):
+    etag = _prime(db, menu)
+
+    food_service.create_category(db, "Main Dish")
+    food_service.seed_categories(db, ["Main Dish"])
+    report = _import(db, "name,price,category\nNo price,,Main Dish\n")
+
+    assert report.failed == 1
+    assert food_service.menu_cache.stats()["size"] == 2
+    assert food_service.search_cache.stats()["size"] == 1
+    assert food_service.menu_validators()[0] == etag
+
+
+def test_search_follows_a_rename_straight_away(db, menu):
+    name = f"Ewa agoyin {next(_suffixes)}"
+    food = food_service.create_food(db, name, "mashed beans", 4.0, menu[0].category_id)
+    assert name in _search("agoyin")
+    assert _search("aganyin") == []
+
+    food_service.update_food_details(db, food.id, {"name": name.replace("agoyin", "aganyin")})
+
+    assert _search("agoyin") == []
+    assert _search("aganyin") == [name.replace("agoyin", "aganyin")]
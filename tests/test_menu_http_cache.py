@@ -0,0 +1,82 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import foods as foods_api
+from app.services import food_service
+from app.utils.http_cache import http_date
+
+
+@pytest.fixture(scope="module")
+def client():
+    from app.main import create_app
+
+    with TestClient(create_app()) as client:
+        yield client
+
+
+class _MenuClock:
+    """time.time() for the conditional-GET code, `offset` seconds after the last menu change."""
+
+    def __init__(self, offset: float):
+        self.offset = offset
+
+    def time(self) -> float:
+        return food_service._menu_version["changed_at"] + self.offset
+
+
+def test_same_etag_gets_a_304(client, menu):
+    first = client.get("/foods/")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    cached = client.get("/foods/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    assert client.get("/foods/", headers={"If-None-Match": f'W/"other", {etag}'}).status_code == 304
+
+
+def test_menu_change_gives_a_new_etag(client, menu):
+    etag = client.get("/foods/").headers["ETag"]
+
+    food_service.invalidate_menu_cache()
+
+    response = client.get("/foods/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert menu[0].name in [food["name"] for food in response.json()]
+
+
+def test_if_modified_since(client, menu, monkeypatch):
+    food_service.invalidate_menu_cache()
+    # Still inside the second of the change: no Last-Modified yet, so nothing can be cached by date
+    monkeypatch.setattr(foods_api, "time", _MenuClock(0))
+    assert "Last-Modified" not in client.get("/foods/categories").headers
+
+    monkeypatch.setattr(foods_api, "time", _MenuClock(1))
+    last_modified = client.get("/foods/categories").headers["Last-Modified"]
+
+    assert client.get("/foods/categories", headers={"If-Modified-Since": last_modified}).status_code == 304
+    earlier = http_date(time.time() - 3600)
+    assert client.get("/foods/categories", headers={"If-Modified-Since": earlier}).status_code == 200
+    assert client.get("/foods/categories", headers={"If-Modified-Since": "not a date"}).status_code == 200
+    # If-None-Match wins when both are sent
+    assert client.get(
+        "/foods/categories", headers={"If-Modified-Since": last_modified, "If-None-Match": '"stale"'}
+    ).status_code == 200
+
+
+def test_single_item(client, menu):
+    response = client.get(f"/foods/{menu[0].id}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert client.get(f"/foods/{menu[0].id}", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_missing_item_is_a_404_before_conditional_checks(client, menu):
+    etag = client.get("/foods/").headers["ETag"]
+    for if_none_match in ("*", etag):
+        assert client.get("/foods/999999", headers={"If-None-Match": if_none_match}).status_code == 404
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.auth_service import CurrentUser, get_admin_user
+from app.utils.metrics import metrics_registry
+
+EXPORT = ("GET", "/orders/export")
+
+
+@pytest.fixture(scope="module")
+def client():
+    from app.main import create_app
+
+    app = create_app()
+    app.dependency_overrides[get_admin_user] = lambda: CurrentUser(
+        id=0, email="admin@example.com", is_admin=True, is_verified=True
+    )
+    with TestClient(app) as client:
+        yield client
+
+
+def _recorded(key):
+    with metrics_registry._lock:
+        return (
+            metrics_registry._latency.get(key, [0])[-1],
+            metrics_registry._sql_statements.get(key, 0),
+            metrics_registry._sql_seconds.get(key, 0.0),
+        )
+
+
+def test_streamed_export_is_observed_with_its_queries(client, place_order):
+    order_id = place_order()
+    before = _recorded(EXPORT)
+
+    response = client.get("/orders/export", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert order_id in [json.loads(line)["id"] for line in response.text.splitlines()]
+    count, statements, seconds = _recorded(EXPORT)
+    # The endpoint itself runs no SQL; everything counted came from the streaming generator
+    assert count == before[0] + 1
+    assert statements > before[1]
+    assert seconds > before[2]
+
+
+def test_plain_responses_are_observed_once(client):
+    key = ("GET", "/")
+    before = _recorded(key)
+
+    assert client.get("/").status_code == 200
+    assert _recorded(key)[0] == before[0] + 1
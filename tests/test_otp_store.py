@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete
+
+from app.models.otp import OTPCode
+from app.services import otp_store as otp_store_module
+from app.services.otp_store import MemoryOTPStore, OTPThrottled, SQLiteOTPStore
+from app.utils import cache, otp
+
+TTL, COOLDOWN, MAX_ATTEMPTS = 300, 60, 3
+EMAIL = "guest@example.com"
+
+
+class _Clock:
+    """Stands in for every clock the stores read: utcnow, TTLCache's monotonic, and verify_otp's now."""
+
+    def __init__(self):
+        self.start = datetime(2026, 1, 1, 12, 0, 0)
+        self.offset = 0.0
+
+    def advance(self, seconds: float):
+        self.offset += seconds
+
+    def utcnow(self) -> datetime:
+        return self.start + timedelta(seconds=self.offset)
+
+    def monotonic(self) -> float:
+        return 1000.0 + self.offset
+
+    def now(self, tz=None) -> datetime:
+        return self.utcnow().replace(tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(otp_store_module, "utcnow", clock.utcnow)
+    monkeypatch.setattr(cache, "time", clock)
+    monkeypatch.setattr(otp, "datetime", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, clock):
+    if request.param == "memory":
+        return lambda ttl=TTL: MemoryOTPStore(ttl, COOLDOWN, MAX_ATTEMPTS, max_entries=100)
+
+    db = request.getfixturevalue("db")
+    db.execute(delete(OTPCode))
+    db.commit()
+    return lambda ttl=TTL: SQLiteOTPStore(ttl, COOLDOWN, MAX_ATTEMPTS)
+
+
+def test_correct_code_is_accepted_once(make_store):
+    store = make_store()
+    code = store.issue(EMAIL)
+
+    assert store.verify("someone@example.com", code) is False
+    assert store.verify(EMAIL, code) is True
+    assert store.verify(EMAIL, code) is False
+
+
+def test_resend_waits_for_the_cooldown(make_store, clock):
+    store = make_store()
+    first = store.issue(EMAIL)
+
+    with pytest.raises(OTPThrottled) as throttled:
+        store.issue(EMAIL)
+    assert throttled.value.retry_after == COOLDOWN
+
+    clock.advance(COOLDOWN - 1)
+    with pytest.raises(OTPThrottled) as throttled:
+        store.issue(EMAIL)
+    assert throttled.value.retry_after == 1
+
+    clock.advance(1)
+    second = store.issue(EMAIL)
+    if second != first:
+        assert store.verify(EMAIL, first) is False
+    assert store.verify(EMAIL, second) is True
+
+
+def test_too_many_wrong_codes_lock_the_code(make_store, clock):
+    store = make_store()
+    code = store.issue(EMAIL)
+    wrong = "000000" if code != "000000" else "111111"
+
+    assert [store.verify(EMAIL, wrong) for _ in range(MAX_ATTEMPTS)] == [False] * MAX_ATTEMPTS
+    with pytest.raises(OTPThrottled):
+        store.verify(EMAIL, code)  # even the right one
+
+    # A new code starts over
+    clock.advance(COOLDOWN)
+    assert store.verify(EMAIL, store.issue(EMAIL)) is True
+
+
+def test_expired_code_is_rejected(make_store, clock):
+    store = make_store()
+    code = store.issue(EMAIL)
+
+    clock.advance(TTL + 1)
+    assert store.verify(EMAIL, code) is False
+
+
+def test_purge_keeps_codes_inside_their_cooldown(make_store, clock):
+    store = make_store(ttl=30)  # shorter than the cooldown
+    store.issue(EMAIL)
+    store.issue("other@example.com")
+
+    clock.advance(31)
+    assert store.purge_expired() == 0  # expired, but dropping them would skip the cooldown
+    with pytest.raises(OTPThrottled):
+        store.issue(EMAIL)
+
+    clock.advance(COOLDOWN)
+    assert store.purge_expired() == 2
+    assert store.purge_expired() == 0
+    store.issue(EMAIL)
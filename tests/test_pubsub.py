@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+from app.utils.pubsub import EVICTED, EventHub
+
+
+def _run(scenario):
+    """Run `scenario(hub)` on a fresh event loop with a hub bound to it."""
+    async def main():
+        hub = EventHub(max_queue=2)
+        hub.bind(asyncio.get_running_loop())
+        return await scenario(hub)
+    return asyncio.run(main())
+
+
+async def _settle():
+    # publish() hands delivery to the loop with call_soon_threadsafe
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_events_fan_out_to_every_matching_topic_once():
+    async def scenario(hub):
+        owner = hub.subscribe("orders:user:1")
+        admin = hub.subscribe("orders:all")
+        both = hub.subscribe("orders:user:1", "orders:all")
+        other = hub.subscribe("orders:user:2")
+
+        hub.publish(["orders:user:1", "orders:all"], {"order_id": 7})
+        await _settle()
+
+        received = [await subscription.get(timeout=0.1) for subscription in (owner, admin, both, other)]
+        assert await both.get(timeout=0.01) is None  # not delivered twice
+        return received, hub.stats()
+
+    received, stats = _run(scenario)
+
+    assert received == [{"order_id": 7}] * 3 + [None]
+    assert stats == {"subscribers": 4, "published": 1, "delivered": 3, "evicted": 0}
+
+
+def test_publish_from_another_thread():
+    async def scenario(hub):
+        subscription = hub.subscribe("orders:all")
+        thread = threading.Thread(target=hub.publish, args=(["orders:all"], {"order_id": 1}))
+        thread.start()
+        thread.join()
+        return await subscription.get(timeout=1)
+
+    assert _run(scenario) == {"order_id": 1}
+
+
+def test_slow_subscriber_is_evicted_without_holding_up_others():
+    async def scenario(hub):
+        slow = hub.subscribe("orders:all")
+        fast = hub.subscribe("orders:all")
+
+        fast_received = []
+        for order_id in range(3):
+            hub.publish(["orders:all"], {"order_id": order_id})
+            await _settle()
+            fast_received.append(await fast.get(timeout=0.1))
+
+        # The backlog is dropped for the notice, and nothing more arrives
+        slow_received = [await slow.get(timeout=0.01) for _ in range(2)]
+        hub.publish(["orders:all"], {"order_id": 3})
+        await _settle()
+        return fast_received, slow_received, slow.queue.empty(), hub.stats()
+
+    fast_received, slow_received, slow_empty, stats = _run(scenario)
+
+    assert fast_received == [{"order_id": 0}, {"order_id": 1}, {"order_id": 2}]
+    assert slow_received == [EVICTED, None]
+    assert slow_empty
+    assert stats["subscribers"] == 1 and stats["evicted"] == 1
+
+
+def test_publishing_with_nobody_listening_is_a_no_op():
+    hub = EventHub(max_queue=2)
+    hub.publish(["orders:all"], {"order_id": 1})  # not even bound to a loop yet
+
+    async def scenario(hub):
+        subscription = hub.subscribe("orders:all")
+        hub.unsubscribe(subscription)
+        hub.publish(["orders:all"], {"order_id": 2})
+        await _settle()
+        return subscription.queue.empty(), hub.stats()
+
+    empty, stats = _run(scenario)
+    assert empty
+    assert stats == {"subscribers": 0, "published": 1, "delivered": 0, "evicted": 0}
+    assert hub.stats()["published"] == 1
@@ -0,0 +1,91 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.utils import rate_limit
+from app.utils.rate_limit import TokenBucketLimiter
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    for limiter in rate_limit.limiters:
+        limiter.clear()
+    yield clock
+    for limiter in rate_limit.limiters:
+        limiter.clear()
+
+
+@pytest.fixture(scope="module")
+def client():
+    from app.main import create_app
+
+    with TestClient(create_app()) as client:
+        yield client
+
+
+def test_bucket_refills_per_key(clock):
+    limiter = TokenBucketLimiter("test", "2/minute", max_keys=10)
+
+    assert [limiter.acquire("1.2.3.4") for _ in range(3)] == [0, 0, 30.0]
+    assert limiter.acquire("5.6.7.8") == 0  # its own bucket
+
+    clock.now += 30
+    assert limiter.acquire("1.2.3.4") == 0
+    assert limiter.acquire("1.2.3.4") == 30.0
+    assert limiter.stats() == {"capacity": 2, "keys": 2, "allowed": 4, "rejected": 2}
+
+
+def test_least_recently_used_keys_are_dropped(clock):
+    limiter = TokenBucketLimiter("test", "1/minute", max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.acquire(key)
+
+    assert limiter.stats()["keys"] == 2
+    assert limiter.acquire("a") == 0  # forgotten, so full again
+    assert limiter.acquire("c") == 60.0
+
+
+def test_register_is_limited_per_ip_with_retry_after(client, clock):
+    # Invalid bodies: the limit applies before validation, the database or bcrypt
+    statuses = [client.post("/auth/register", json={}).status_code for _ in range(10)]
+    assert statuses == [422] * 10
+
+    response = client.post("/auth/register", json={})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "6"  # 10/minute
+
+    clock.now += 6
+    assert client.post("/auth/register", json={}).status_code == 422
+
+
+def test_login_is_limited_per_email(client, clock):
+    def login(email):
+        return client.post("/auth/login", json={"email": email, "password": "wrong-password"})
+
+    assert {login("Flood@Example.com").status_code for _ in range(10)} == {401}
+    # Case and spacing don't make a new bucket
+    response = login(" flood@example.com ")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "6"
+
+    assert login("someone-else@example.com").status_code == 401
+
+
+def test_verify_and_resend_share_the_otp_email_bucket(client, clock):
+    email = "otp-flood@example.com"
+    for _ in range(5):
+        assert client.post("/auth/verify", json={"email": email, "otp_code": "000000"}).status_code == 400
+        assert client.post("/auth/resend-otp", json={"email": email}).status_code == 404
+
+    assert client.post("/auth/resend-otp", json={"email": email}).status_code == 429
+    assert client.post("/auth/verify", json={"email": email, "otp_code": "000000"}).status_code == 429
+    assert client.post("/auth/resend-otp", json={"email": "other@example.com"}).status_code == 404
@@ -0,0 +1,69 @@
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.food import Category
+from app.models.sales import DailyCategorySales, DailyFoodSales
+from app.services import order_service
+from app.services.analytics_service import rebuild_rollups
+from app.services.food_service import seed_categories
+from app.utils.clock import utcnow
+
+
+def _sold(db, food_id: int):
+    db.expire_all()
+    return db.execute(
+        select(DailyFoodSales.day, DailyFoodSales.orders, DailyFoodSales.quantity, DailyFoodSales.revenue)
+        .where(DailyFoodSales.food_id == food_id)
+    ).all()
+
+
+def test_cancelling_during_a_rebuild_counts_each_order_once(db, menu, place_order):
+    kept, unread, read = place_order("pending"), place_order("pending"), place_order("pending")
+
+    def cancel(order_id):
+        with SessionLocal() as other:
+            order_service.update_order_status(other, order_id, "cancelled")
+
+    def progress(done, total):
+        if total != read:
+            return  # reading the archive by now
+        if done == 1:
+            cancel(unread)  # not reached yet: the rebuild must be the one to leave it out
+        elif done == read:
+            cancel(read)  # already counted, so it has to be taken back out
+
+    rebuild_rollups(db, batch_size=1, progress=progress)
+
+    assert _sold(db, menu[0].id) == [(utcnow().date(), 1, 2, 20.0)]
+    db.commit()
+    assert rebuild_rollups(db) and _sold(db, menu[0].id) == [(utcnow().date(), 1, 2, 20.0)]
+
+
+def test_cancelling_credits_back_the_category_counted_at_checkout(db, menu, place_order):
+    order_id = place_order("pending", lines=[(0, 3)])
+    old_category = menu[0].category_id
+    seed_categories(db, ["Sides"])
+    menu[0].category_id = db.scalar(select(Category.id).where(Category.name == "Sides"))
+    db.commit()
+
+    def category_totals():
+        db.expire_all()
+        return dict(db.execute(
+            select(DailyCategorySales.category_id, DailyCategorySales.quantity)
+            .where(
+                DailyCategorySales.day == utcnow().date(),
+                DailyCategorySales.category_id.in_([old_category, menu[0].category_id])
+            )
+        ).all())
+
+    before = category_totals()
+    order_service.update_order_status(db, order_id, "cancelled")
+    after = category_totals()
+
+    assert after[old_category] == before[old_category] - 3
+    assert after.get(menu[0].category_id, 0) == before.get(menu[0].category_id, 0)
+    assert min(after.values()) >= 0
+
+    db.commit()
+    rebuild_rollups(db)
+    assert category_totals() == after
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous enough for a slow CI machine, tight enough to catch work creeping back into import/startup
+IMPORT_BUDGET_SECONDS = 3.0
+STARTUP_BUDGET_SECONDS = 2.0
+
+
+def test_import_is_fast_and_touches_no_database(tmp_path):
+    db_path = tmp_path / "import_check.db"
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", SECRET_KEY="test-secret")
+    code = "import time; start = time.perf_counter(); import app.main; print(time.perf_counter() - start)"
+
+    # A fresh interpreter, so nothing is already imported
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+    assert float(result.stdout.strip().splitlines()[-1]) < IMPORT_BUDGET_SECONDS
+    assert not db_path.exists()
+
+
+def test_startup_is_fast_and_idempotent():
+    from app.database import SessionLocal
+    from app.main import create_app
+    from app.models.food import Category
+
+    # First start creates the schema and seeds, the second one should find both already in place
+    for _ in range(2):
+        start = time.perf_counter()
+        with TestClient(create_app()) as client:
+            elapsed = time.perf_counter() - start
+            assert client.get("/").status_code == 200
+        assert elapsed < STARTUP_BUDGET_SECONDS
+
+    with SessionLocal() as db:
+        names = sorted(name for (name,) in db.query(Category.name))
+    assert names == ["Desserts", "Drinks", "Main Dish", "Sides"]
+
+
+def test_init_db_skips_current_schema():
+    from app.database import init_db
+
+    init_db()
+    assert init_db() is False